@@ -1,43 +1,55 @@
 import os
-import re
-import json
 import html
-import hashlib
 from datetime import datetime
-from typing import Any, Dict, List
-from io import BytesIO
+from typing import TYPE_CHECKING, Any, Dict, List
 
 import streamlit as st
 import streamlit.components.v1 as components
 from dotenv import load_dotenv
-from openai import OpenAI
-
-from utils.cv_extract import extract_cv_text
-
-
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
-from docx import Document
-
-
-
-
-
-def now_ts() -> str:
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+from utils.batch_mode import (
+    DEFAULT_BATCH_DIR,
+    LocalBatchClient,
+    collect_batch,
+    collectable,
+    list_batches,
+    load_manifest,
+    purge_batches,
+    refresh_batch,
+    submit_batch,
+)
+from utils.cv_store import DEFAULT_CV_DIR, delete_cv_text, has_cv_text, load_cv_text, store_cv_text, sweep_cv_text
+from utils.exports import build_full_text_with_notes, make_docx_bytes, make_pdf_bytes
+from utils.jd_diff import boundary_order, diff_requirements
+from utils.job_queue import (
+    DEFAULT_DB,
+    cancel_job,
+    ensure_workers,
+    job_failures,
+    job_results,
+    job_status,
+    job_summaries,
+    list_jobs,
+    purge_jobs,
+    retry_failed,
+    submit_job,
+)
+from utils.openai_transport import ConnectionStats, build_openai_client, transport_settings_from_env
+from utils.replay import RecordingClient, ReplayClient
+from utils.scoring import call_openai_json, extraction_error_entry, jd_hash, normalize_result, safe_int
+from utils.session_io import (
+    SESSION_EXT,
+    dump_session,
+    ensure_content_hash,
+    load_session,
+    merge_history,
+    resolve_ranking,
+)
 
-def stable_id(*parts: str) -> str:
-    raw = "||".join([p or "" for p in parts]).encode("utf-8", errors="ignore")
-    return hashlib.sha1(raw).hexdigest()[:12]
+if TYPE_CHECKING:
+    import pandas as pd
 
 
-def safe_int(x: Any, default: int = 0) -> int:
-    try:
-        return int(x)
-    except Exception:
-        return default
 
 
 def init_state():
@@ -57,11 +69,31 @@ def init_state():
         st.session_state.compare_ids = []
 
     
+    if "background_jobs" not in st.session_state:
+        st.session_state.background_jobs = True
+    if "active_job_id" not in st.session_state:
+        st.session_state.active_job_id = None
+    if "batch_api" not in st.session_state:
+        st.session_state.batch_api = False
+    if "jd_versions" not in st.session_state:
+        st.session_state.jd_versions = {}
+    if "jd_diffs" not in st.session_state:
+        st.session_state.jd_diffs = {}
+    if "results_version" not in st.session_state:
+        st.session_state.results_version = 0
+
+    
     if "uploader_key" not in st.session_state:
         st.session_state.uploader_key = "cv_uploader_0"
 
 
+def results_changed():
+    # Cached tables and the prepared session export are keyed on this counter, not on the lists themselves.
+    st.session_state.results_version += 1
+
+
 def reset_all(clear_history: bool = False, reset_uploads: bool = False):
+    results_changed()
     st.session_state.selected_id = None
     st.session_state.ranking_results = []
     st.session_state.job_text = ""
@@ -69,7 +101,12 @@ def reset_all(clear_history: bool = False, reset_uploads: bool = False):
     st.session_state.compare_ids = []
 
     if clear_history:
+        # The session's CV texts go with it; its results can still be loaded from a job or batch, just not re-scored.
+        entries = st.session_state.history + st.session_state.ranking_results
+        delete_cv_text([e.get("cv_hash") for e in entries], CV_DIR)
         st.session_state.history = []
+        st.session_state.jd_versions = {}
+        st.session_state.jd_diffs = {}
 
     
     if reset_uploads:
@@ -81,6 +118,176 @@ def reset_all(clear_history: bool = False, reset_uploads: bool = False):
         st.session_state.uploader_key = f"cv_uploader_{n}"
 
 
+def export_session_bytes() -> bytes:
+    return dump_session(
+        st.session_state.history,
+        st.session_state.ranking_results,
+        selected_id=st.session_state.selected_id,
+        job_text=st.session_state.job_text,
+        shortlist_threshold=st.session_state.shortlist_threshold,
+        jd_versions=st.session_state.jd_versions,
+    )
+
+
+def import_session_bytes(blob: bytes) -> str:
+    payload = load_session(blob)
+    was_empty = not st.session_state.history
+    merged, added, updated = merge_history(st.session_state.history, payload.get("history") or [])
+    st.session_state.history = merged
+    st.session_state.jd_versions.update(payload.get("jd_versions") or {})
+    results_changed()
+
+    ranking = resolve_ranking(merged, payload.get("ranking") or [])
+    if ranking:
+        st.session_state.ranking_results = ranking
+        st.session_state.compare_ids = []
+
+    # Drop cached note widgets so imported notes are shown on the next run.
+    for h in merged:
+        st.session_state.pop(f"notes_{h['id']}", None)
+
+    if not st.session_state.job_text and payload.get("job_text"):
+        st.session_state.job_text = payload["job_text"]
+    if was_empty and payload.get("shortlist_threshold") is not None:
+        st.session_state.shortlist_threshold = min(100, max(0, safe_int(payload["shortlist_threshold"], 75)))
+    if not st.session_state.selected_id:
+        ids = {h["id"] for h in merged}
+        if payload.get("selected_id") in ids:
+            st.session_state.selected_id = payload["selected_id"]
+        elif ranking:
+            st.session_state.selected_id = ranking[0]["id"]
+
+    return f"Imported {added} new analyses ({updated} updated with notes)."
+
+
+def remember_jd(job_text: str) -> str:
+    h = jd_hash(job_text)
+    st.session_state.jd_versions.setdefault(h, job_text.strip())
+    return h
+
+
+def jd_changes(job_text: str) -> Dict[str, Any]:
+    current = jd_hash(job_text)
+    fresh = {current, ""}
+    stale: Dict[str, Dict[str, Any]] = {}
+    for h in {r.get("jd_hash") or "" for r in st.session_state.ranking_results} - fresh:
+        old_text = st.session_state.jd_versions.get(h)
+        if old_text is None:
+            # Scored before JD versions were tracked; nothing to compare against.
+            fresh.add(h)
+            continue
+        key = f"{h}->{current}"
+        if key not in st.session_state.jd_diffs:
+            st.session_state.jd_diffs[key] = diff_requirements(old_text, job_text)
+        d = st.session_state.jd_diffs[key]
+        if d["cosmetic"]:
+            fresh.add(h)
+        else:
+            stale[h] = d
+    return {"fresh": fresh, "stale": stale}
+
+
+def rescore_entries(entries: List[Dict[str, Any]], job_text: str):
+    remember_jd(job_text)
+    replaced: Dict[str, Dict[str, Any]] = {}
+    used_ids = {h["id"] for h in st.session_state.history}
+
+    for old in entries:
+        source = old["cv_source"]
+        cv_text = load_cv_text(old.get("cv_hash"), CV_DIR)
+        if cv_text is None:
+            continue
+        data = call_openai_json(client, MODEL, job_text, cv_text)
+        new = normalize_result(
+            data,
+            source,
+            job_text,
+            id_source="pasted_text" if source == "Pasted text" else None,
+            cv_hash=old["cv_hash"],
+        )
+        new["recruiter_notes"] = old.get("recruiter_notes", "")
+        if new["id"] in used_ids:
+            new["id"] = ensure_content_hash(new)[:12]
+        used_ids.add(new["id"])
+        ensure_content_hash(new)
+        st.session_state.history.append(new)
+        replaced[old["id"]] = new
+
+    ranking = [replaced.get(r["id"], r) for r in st.session_state.ranking_results]
+    ranking.sort(key=lambda r: safe_int(r["overall_score"]), reverse=True)
+    st.session_state.ranking_results = ranking
+    results_changed()
+    st.session_state.compare_ids = [replaced[i]["id"] if i in replaced else i for i in st.session_state.compare_ids]
+    if st.session_state.selected_id in replaced:
+        st.session_state.selected_id = replaced[st.session_state.selected_id]["id"]
+
+
+def load_job_into_session(job_id: str) -> int:
+    job = job_status(job_id, JOBS_DB)
+    if job:
+        remember_jd(job["job_text"])
+    return load_results_into_session(job_results(job_id, JOBS_DB))
+
+
+def load_batch_into_session(batch_id: str) -> str:
+    manifest = load_manifest(batch_id, BATCH_DIR)
+    remember_jd(manifest["job_text"])
+    collected = collect_batch(batch_client, manifest)
+    added = load_results_into_session(collected["results"])
+    msg = f"Loaded {len(collected['results'])} result(s), {added} new."
+    if collected["failures"]:
+        msg += f" {len(collected['failures'])} request(s) failed: " + ", ".join(f["cv_source"] for f in collected["failures"][:5])
+    return msg
+
+
+def load_results_into_session(results: List[Dict[str, Any]]) -> int:
+    merged, added, _ = merge_history(st.session_state.history, results)
+    st.session_state.history = merged
+
+    ranking = resolve_ranking(merged, [ensure_content_hash(r) for r in results])
+    ranking.sort(key=lambda r: safe_int(r["overall_score"]), reverse=True)
+    st.session_state.ranking_results = ranking
+    results_changed()
+    st.session_state.compare_ids = []
+    if ranking:
+        st.session_state.selected_id = ranking[0]["id"]
+    return added
+
+
+@st.fragment(run_every=2)
+def job_progress(job_id: str):
+    job = job_status(job_id, JOBS_DB)
+    if job is None:
+        st.session_state.active_job_id = None
+        return
+
+    finished = job["completed"] + job["failed"]
+    st.progress(
+        finished / max(job["total"], 1),
+        text=f"Background job {job_id}: {job['status']} • {finished}/{job['total']} CV(s)"
+        + (f" • {job['failed']} failed" if job["failed"] else ""),
+    )
+
+    partial = job_summaries(job_id, JOBS_DB)
+    if partial:
+        st.dataframe(
+            [{"Score": p["overall_score"], "Recommendation": p["recommendation"], "Candidate": p["cv_source"]} for p in partial],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    if job["status"] in ("queued", "running"):
+        # Starts the job's worker, and replaces one that died mid-job (OOM, host restart) once its heartbeat is stale.
+        ensure_workers(JOBS_DB, JOB_WORKERS)
+        if st.button("Cancel job"):
+            cancel_job(job_id, JOBS_DB)
+        return
+
+    load_job_into_session(job_id)
+    st.session_state.active_job_id = None
+    st.rerun()
+
+
 def copy_to_clipboard_button(text: str, button_label: str = "Copy to clipboard"):
     escaped = html.escape(text or "")
     components.html(
@@ -131,252 +338,32 @@ def badge_row(items: List[str], limit: int = 30):
 
 
 
-def build_full_text_with_notes(entry: Dict[str, Any]) -> str:
-    base = (entry.get("report_text") or "").strip()
-    notes = (entry.get("recruiter_notes") or "").strip()
-
-    if notes:
-        return f"{base}\n\n## Recruiter notes\n- {notes}\n"
-    return base
-
-
-
-
-
-def make_pdf_bytes(title: str, subtitle: str, body_text: str) -> bytes:
-    buff = BytesIO()
-    c = canvas.Canvas(buff, pagesize=A4)
-    width, height = A4
-
-    left = 2.0 * cm
-    top = height - 2.0 * cm
-    y = top
-
-    def draw_wrapped(text: str, font="Helvetica", size=10):
-        nonlocal y
-        c.setFont(font, size)
-        max_w = width - 2 * left
-
-        words = text.split()
-        line = ""
-        for w in words:
-            test = (line + " " + w).strip()
-            if c.stringWidth(test, font, size) <= max_w:
-                line = test
-            else:
-                c.drawString(left, y, line)
-                y -= 12
-                line = w
-                if y < 2 * cm:
-                    c.showPage()
-                    y = top
-                    c.setFont(font, size)
-
-        if line:
-            c.drawString(left, y, line)
-            y -= 12
-            if y < 2 * cm:
-                c.showPage()
-                y = top
-
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(left, y, title)
-    y -= 18
-
-    if subtitle:
-        c.setFont("Helvetica", 10)
-        c.drawString(left, y, subtitle[:120])
-        y -= 18
-
-    y -= 6
-    c.line(left, y, width - left, y)
-    y -= 18
-
-    for raw in body_text.replace("\r\n", "\n").splitlines():
-        line = raw.strip()
-        if not line:
-            y -= 8
-            if y < 2 * cm:
-                c.showPage()
-                y = top
-            continue
-
-        if line.startswith("## "):
-            y -= 6
-            draw_wrapped(line.replace("## ", ""), font="Helvetica-Bold", size=12)
-            y -= 2
-        else:
-            if line.startswith(("-", "*")):
-                line = "• " + line[1:].strip()
-            draw_wrapped(line, font="Helvetica", size=10)
-
-    c.save()
-    buff.seek(0)
-    return buff.read()
-
-
-def make_docx_bytes(title: str, subtitle: str, body_text: str) -> bytes:
-    doc = Document()
-    doc.add_heading(title, level=1)
-    if subtitle:
-        doc.add_paragraph(subtitle)
-
-    for raw in body_text.replace("\r\n", "\n").splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-        if line.startswith("## "):
-            doc.add_heading(line.replace("## ", ""), level=2)
-        elif line.startswith(("-", "*")):
-            doc.add_paragraph(line[1:].strip(), style="List Bullet")
-        else:
-            doc.add_paragraph(line)
-
-    bio = BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    return bio.read()
-
-
-
-
-
-def json_to_markdown_report(cv_source: str, data: Dict[str, Any]) -> str:
-    score = data.get("overall_score", "N/A")
-    reco = data.get("recommendation", "N/A")
-    subs = data.get("subscores", {}) or {}
-    expl = data.get("explainable_score", {}) or {}
-    interview = data.get("interview_guide", {}) or {}
-
-    def bullets(arr):
-        arr = arr or []
-        return "\n".join([f"- {x}" for x in arr if x]) or "—"
+@st.cache_data(show_spinner=False, max_entries=32)
+def export_bytes(kind: str, title: str, subtitle: str, body_text: str) -> bytes:
+    if kind == "pdf":
+        return make_pdf_bytes(title, subtitle, body_text)
+    return make_docx_bytes(title, subtitle, body_text)
 
-    report = f"""## Candidate
-- Source: {cv_source}
 
-## Overall match score
-{score}
 
-## Recommendation
-{reco}
 
-## Explainable score
-**Subscores**
-- Skills: {subs.get("skills", 0)}
-- Experience: {subs.get("experience", 0)}
-- Tools: {subs.get("tools", 0)}
-- Domain: {subs.get("domain", 0)}
 
-**Why this score**
-{bullets(expl.get("why_this_score", []))}
+def results_table(name: str) -> "pd.DataFrame":
+    # pandas is only imported once there are results to show, keeping it off the cold start.
+    from utils.results_table import results_frame
 
-**Top evidence**
-{bullets(expl.get("top_evidence", []))}
-
-## Executive summary
-{data.get("summary","") or "—"}
-
-## Key strengths
-{bullets(data.get("strengths", []))}
-
-## Gaps & risks
-{bullets(data.get("gaps_risks", []))}
-
-## Missing keywords / requirements
-{bullets(data.get("missing_keywords", []))}
-
-## Interview guide (focused on gaps)
-**Critical**
-{bullets(interview.get("critical", []))}
-
-**Nice-to-have**
-{bullets(interview.get("nice_to_have", []))}
-
-## CV improvement suggestions
-{bullets(data.get("cv_improvements", []))}
-"""
-    return report.strip()
-
-
-
-
-
-def build_schema_instruction() -> str:
-    return """
-Return ONLY a valid JSON object with EXACTLY these keys:
-{
-  "overall_score": <integer 0-100>,
-  "recommendation": <one of "Strong Yes","Yes","Maybe","No">,
-  "subscores": {
-    "skills": <0-100>,
-    "experience": <0-100>,
-    "tools": <0-100>,
-    "domain": <0-100>
-  },
-  "explainable_score": {
-    "why_this_score": [<bullet strings>],
-    "top_evidence": [<short evidence strings referencing CV facts>]
-  },
-  "strengths": [<bullet strings>],
-  "gaps_risks": [<bullet strings>],
-  "missing_keywords": [<strings>],
-  "interview_guide": {
-    "critical": [<questions/checks>],
-    "nice_to_have": [<questions/checks>]
-  },
-  "cv_improvements": [<bullet strings>],
-  "summary": <1-2 sentence executive summary>
-}
-
-Rules:
-- Do NOT invent. Only claim what is explicitly in the CV.
-- Keep bullets short and business-ready.
-""".strip()
-
-
-def call_openai_json(client: OpenAI, model: str, job_text: str, cv_text: str) -> Dict[str, Any]:
-    prompt = f"""
-You are a senior HR Talent Intelligence analyst.
-
-Task: Assess CV vs Job Description with a factual, explainable evaluation.
-{build_schema_instruction()}
-
-JOB DESCRIPTION:
-{job_text}
-
-CANDIDATE CV:
-{cv_text}
-""".strip()
-
-    try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "Be rigorous, factual, and concise. Output JSON only."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-            response_format={"type": "json_object"},
-        )
-        return json.loads(resp.choices[0].message.content)
-    except Exception:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "Be rigorous, factual, and concise. Output JSON only."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
-        content = resp.choices[0].message.content or ""
-        m = re.search(r"\{.*\}", content, flags=re.DOTALL)
-        if not m:
-            raise ValueError("Model did not return JSON.")
-        return json.loads(m.group(0))
+    rows = st.session_state[name]
+    token = st.session_state.results_version
+    cache = st.session_state.setdefault("results_tables", {})
+    hit = cache.get(name)
+    if hit is None or hit[0] != token:
+        hit = (token, results_frame(rows))
+        cache[name] = hit
+    return hit[1]
 
 
 def update_notes(entry_id: str, notes: str):
+    st.session_state.pop("session_export", None)
     for h in st.session_state.history:
         if h["id"] == entry_id:
             h["recruiter_notes"] = notes
@@ -390,14 +377,61 @@ def update_notes(entry_id: str, notes: str):
 
 
 
-load_dotenv()
+@st.cache_resource(show_spinner=False)
+def get_openai_client(api_key: str, settings: Dict[str, Any]):
+    stats = ConnectionStats()
+    return build_openai_client(api_key, settings, stats), stats
+
+
+@st.cache_resource(show_spinner=False)
+def get_replay_client(path: str) -> ReplayClient:
+    return ReplayClient(path)
+
+
+@st.cache_resource(show_spinner=False)
+def get_local_batch_client(root: str, _responder) -> LocalBatchClient:
+    return LocalBatchClient(root, _responder)
+
+
+@st.cache_resource(show_spinner=False)
+def sweep_stored_data(days: int, db_path: str, batch_dir: str, cv_dir: str, _batch_client) -> Dict[str, int]:
+    # Once per process: finished jobs, batch runs and CV texts older than the retention window are deleted.
+    return {
+        "jobs": purge_jobs(days, db_path),
+        "batches": purge_batches(_batch_client, days, batch_dir),
+        "cv_texts": sweep_cv_text(days, cv_dir),
+    }
+
+
+# .env only needs to be read once per process; afterwards the key lives in os.environ.
+if not os.getenv("OPENAI_API_KEY"):
+    load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
+REPLAY_PATH = os.getenv("TMA_REPLAY_PATH")
+RECORD_PATH = os.getenv("TMA_RECORD_PATH")
+if not api_key and not REPLAY_PATH:
     st.error("OPENAI_API_KEY not found in .env")
     st.stop()
 
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-client = OpenAI(api_key=api_key)
+JOBS_DB = DEFAULT_DB
+CV_DIR = DEFAULT_CV_DIR
+JOB_WORKERS = max(1, safe_int(os.getenv("TMA_WORKERS"), 1))
+RETENTION_DAYS = safe_int(os.getenv("TMA_RETENTION_DAYS"), 30)
+BATCH_DIR = os.getenv("TMA_BATCH_DIR") or str(DEFAULT_BATCH_DIR)
+TRANSPORT = transport_settings_from_env()
+if REPLAY_PATH:
+    client, conn_stats = get_replay_client(REPLAY_PATH), ConnectionStats()
+    batch_client = get_local_batch_client(os.path.join(BATCH_DIR, "local"), client)
+else:
+    client, conn_stats = get_openai_client(api_key, TRANSPORT)
+    batch_client = client
+    if os.getenv("TMA_BATCH_LOCAL"):
+        batch_client = get_local_batch_client(os.path.join(BATCH_DIR, "local"), client)
+    if RECORD_PATH:
+        client = RecordingClient(client, RECORD_PATH)
+if RETENTION_DAYS > 0:
+    sweep_stored_data(RETENTION_DAYS, JOBS_DB, BATCH_DIR, CV_DIR, batch_client)
 
 st.set_page_config(page_title="Talent Match Assistant", page_icon="🧠", layout="wide")
 init_state()
@@ -483,6 +517,18 @@ with st.sidebar:
             reset_all(clear_history=True, reset_uploads=True)
             st.rerun()
 
+    st.session_state.background_jobs = st.toggle(
+        "Run uploads as background job",
+        value=st.session_state.background_jobs,
+        help="Scoring keeps running if the tab is closed or the app reruns; finished CVs are never re-scored.",
+    )
+
+    st.session_state.batch_api = st.toggle(
+        "Submit uploads via Batch API",
+        value=st.session_state.batch_api,
+        help="For overnight runs: cheaper and not rate limited, results arrive within 24h. Check and load them under 'Batch runs'.",
+    )
+
     st.session_state.shortlist_threshold = st.slider(
         "Shortlist threshold",
         min_value=0,
@@ -505,7 +551,8 @@ with st.sidebar:
             subtitle = f"Score: {selected.get('overall_score')}/100 | Recommendation: {selected.get('recommendation')} | {selected.get('cv_source')}"
 
             
-            pdf_bytes = make_pdf_bytes(
+            pdf_bytes = export_bytes(
+                "pdf",
                 title="Talent Match Assistant",
                 subtitle=subtitle,
                 body_text=full_text,
@@ -519,7 +566,8 @@ with st.sidebar:
             )
 
             
-            docx_bytes = make_docx_bytes(
+            docx_bytes = export_bytes(
+                "docx",
                 title="Talent Match Assistant",
                 subtitle=subtitle,
                 body_text=full_text,
@@ -547,6 +595,115 @@ with st.sidebar:
     else:
         st.caption("No analyses yet.")
 
+    with st.expander("Connection stats"):
+        snap = conn_stats.snapshot()
+        st.caption(
+            f"{'HTTP/2' if TRANSPORT['http2'] else 'HTTP/1.1'} • pool {TRANSPORT['max_connections']} • "
+            f"timeouts {TRANSPORT['connect_timeout']:g}s connect / {TRANSPORT['read_timeout']:g}s read"
+            + (f" • {TRANSPORT['base_url']}" if TRANSPORT["base_url"] else "")
+        )
+        st.caption(
+            f"Requests {snap['requests']} • new connections {snap['new_connections']} • "
+            f"reused {snap['reused_connections']} ({snap['reuse_ratio']:.0%})"
+        )
+        if snap["recent"]:
+            st.dataframe(snap["recent"][-10:], use_container_width=True, hide_index=True)
+
+    st.markdown("---")
+    st.markdown("### Background jobs")
+    jobs = list_jobs(limit=10, db_path=JOBS_DB)
+    # While a job is polled its fragment keeps workers running; otherwise unfinished jobs are picked up here.
+    if not st.session_state.active_job_id and any(j["status"] in ("queued", "running") for j in jobs):
+        ensure_workers(JOBS_DB, JOB_WORKERS)
+    if jobs:
+        job_labels = {
+            j["id"]: f"{j['created_at']} • {j['status']} • {j['completed']}/{j['total']}" + (f" • {j['failed']} failed" if j["failed"] else "")
+            for j in jobs
+        }
+        job_pick = st.selectbox("Recent jobs", list(job_labels), format_func=job_labels.get)
+        j1, j2 = st.columns(2)
+        with j1:
+            if st.button("Load results", use_container_width=True):
+                load_job_into_session(job_pick)
+                st.rerun()
+        picked = next(j for j in jobs if j["id"] == job_pick)
+        with j2:
+            if picked["failed"] and picked["status"] != "running" and st.button("Retry failed", use_container_width=True):
+                retry_failed(job_pick, JOBS_DB)
+                st.session_state.active_job_id = job_pick
+                st.rerun()
+        if picked["error"]:
+            st.caption(f"Job stopped: {picked['error']}")
+        if picked["failed"]:
+            with st.expander(f"Failed CVs ({picked['failed']})"):
+                for f in job_failures(job_pick, JOBS_DB):
+                    st.markdown(f"- **{f['name']}**: {f['error']}")
+    else:
+        st.caption("No background jobs yet.")
+
+    st.markdown("---")
+    st.markdown("### Batch runs")
+    batches = list_batches(BATCH_DIR)
+    if batches:
+        batch_labels = {
+            b["batch_id"]: f"{b['created_at']} • {b['status']} • {b['completed']}/{b['total']}" + (f" • {b['failed']} failed" if b["failed"] else "")
+            for b in batches
+        }
+        batch_pick = st.selectbox("Recent batches", list(batch_labels), format_func=batch_labels.get)
+        b1, b2 = st.columns(2)
+        with b1:
+            if st.button("Check status", use_container_width=True):
+                try:
+                    refresh_batch(batch_client, load_manifest(batch_pick, BATCH_DIR), BATCH_DIR)
+                except Exception as e:
+                    st.session_state.batch_msg = f"Status check failed: {e}"
+                st.rerun()
+        with b2:
+            picked_batch = next(b for b in batches if b["batch_id"] == batch_pick)
+            label = "Load results" if picked_batch["status"] == "completed" else "Load partial results"
+            if collectable(picked_batch) and st.button(label, key="load_batch", use_container_width=True):
+                try:
+                    st.session_state.batch_msg = load_batch_into_session(batch_pick)
+                except Exception as e:
+                    st.session_state.batch_msg = f"Loading results failed: {e}"
+                st.rerun()
+        if st.session_state.get("batch_msg"):
+            st.caption(st.session_state.batch_msg)
+    else:
+        st.caption("No batch runs yet.")
+
+    st.markdown("---")
+    st.markdown("### Session")
+    if st.session_state.history:
+        # Building the file is proportional to the history, so it only happens on request.
+        token = st.session_state.results_version
+        prepared = st.session_state.get("session_export")
+        if prepared is None or prepared[0] != token:
+            if st.button("Prepare session export", use_container_width=True):
+                st.session_state.session_export = (
+                    token,
+                    export_session_bytes(),
+                    f"talent_match_session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{SESSION_EXT}",
+                )
+                st.rerun()
+        else:
+            st.download_button(
+                "Export session",
+                data=prepared[1],
+                file_name=prepared[2],
+                mime="application/octet-stream",
+                use_container_width=True,
+            )
+    session_file = st.file_uploader("Import session", type=[SESSION_EXT], key="session_uploader")
+    if session_file is not None and st.button("Merge into session", use_container_width=True):
+        try:
+            st.session_state.session_import_msg = import_session_bytes(session_file.getvalue())
+        except Exception as e:
+            st.session_state.session_import_msg = f"Import failed: {e}"
+        st.rerun()
+    if st.session_state.get("session_import_msg"):
+        st.caption(st.session_state.session_import_msg)
+
 
 
 
@@ -582,7 +739,9 @@ analyze = st.button("Analyze match", type="primary")
 
 
 def add_report_to_history(entry: Dict[str, Any]):
+    ensure_content_hash(entry)
     st.session_state.history.append(entry)
+    results_changed()
     st.session_state.selected_id = entry["id"]
 
 
@@ -595,74 +754,54 @@ if analyze:
         st.error("Please paste a Job Description.")
         st.stop()
 
+    remember_jd(job_text)
     results: List[Dict[str, Any]] = []
 
-    if cv_files:
+    if cv_files and st.session_state.batch_api:
+        from utils.cv_extract import extract_cv_text
+
+        cvs, errors = [], []
+        with st.spinner(f"Extracting {len(cv_files)} CV(s) for the batch..."):
+            for f in cv_files:
+                try:
+                    cv_text, detected = extract_cv_text(f.name, f.getvalue())
+                    cvs.append({"cv_source": f"{f.name} ({detected.upper()})", "cv_hash": store_cv_text(cv_text, CV_DIR)})
+                except Exception as e:
+                    errors.append(extraction_error_entry(f.name, job_text, e))
+
+        if cvs:
+            try:
+                manifest = submit_batch(batch_client, job_text, MODEL, cvs, errors, BATCH_DIR, CV_DIR)
+                st.session_state.batch_msg = f"Submitted batch {manifest['batch_id']} with {len(cvs)} CV(s)."
+            except Exception as e:
+                st.session_state.batch_msg = f"Batch submission failed: {e}"
+        else:
+            st.session_state.batch_msg = "No CV text could be extracted; nothing was submitted."
+        st.rerun()
+
+    elif cv_files and st.session_state.background_jobs:
+        items = [{"name": f.name, "kind": "file", "file": f, "size": f.size} for f in cv_files]
+        st.session_state.active_job_id = submit_job(job_text, MODEL, items, JOBS_DB)
+        st.rerun()
+
+    elif cv_files:
+        from utils.cv_extract import extract_cv_text
+
         with st.spinner(f"Analyzing {len(cv_files)} CV(s)..."):
             for f in cv_files:
                 try:
-                    file_bytes = f.read()
-                    cv_text, detected = extract_cv_text(f.name, file_bytes)
+                    cv_text, detected = extract_cv_text(f.name, f.getvalue())
                     cv_source = f"{f.name} ({detected.upper()})"
                 except Exception as e:
-                    rid = stable_id(job_text[:120], f.name, "extract_error")
-                    results.append({
-                        "id": rid,
-                        "timestamp": now_ts(),
-                        "cv_source": f.name,
-                        "overall_score": 0,
-                        "recommendation": "No",
-                        "subscores": {"skills": 0, "experience": 0, "tools": 0, "domain": 0},
-                        "summary": "Extraction failed.",
-                        "missing_keywords": [],
-                        "strengths": [],
-                        "gaps_risks": [f"Failed to extract CV text: {e}"],
-                        "interview_guide": {"critical": ["Re-upload as DOCX or paste text"], "nice_to_have": []},
-                        "cv_improvements": [],
-                        "explainable_score": {"why_this_score": ["No text extracted"], "top_evidence": []},
-                        "recruiter_notes": "",
-                        "report_text": "Extraction failed.",
-                    })
+                    results.append(extraction_error_entry(f.name, job_text, e))
                     continue
 
                 data = call_openai_json(client, MODEL, job_text, cv_text)
-
-                score = safe_int(data.get("overall_score"), 0)
-                reco = (data.get("recommendation") or "Maybe").strip()
-                subs = data.get("subscores") or {}
-                interview = data.get("interview_guide") or {"critical": [], "nice_to_have": []}
-
-                rid = stable_id(job_text[:160], cv_source, str(score), reco)
-                report_text = json_to_markdown_report(cv_source, data)
-
-                results.append({
-                    "id": rid,
-                    "timestamp": now_ts(),
-                    "cv_source": cv_source,
-                    "overall_score": score,
-                    "recommendation": reco,
-                    "subscores": {
-                        "skills": safe_int(subs.get("skills"), 0),
-                        "experience": safe_int(subs.get("experience"), 0),
-                        "tools": safe_int(subs.get("tools"), 0),
-                        "domain": safe_int(subs.get("domain"), 0),
-                    },
-                    "summary": data.get("summary", ""),
-                    "missing_keywords": data.get("missing_keywords") or [],
-                    "strengths": data.get("strengths") or [],
-                    "gaps_risks": data.get("gaps_risks") or [],
-                    "interview_guide": {
-                        "critical": (interview.get("critical") or []),
-                        "nice_to_have": (interview.get("nice_to_have") or []),
-                    },
-                    "cv_improvements": data.get("cv_improvements") or [],
-                    "explainable_score": data.get("explainable_score") or {"why_this_score": [], "top_evidence": []},
-                    "recruiter_notes": "",
-                    "report_text": report_text,
-                })
+                results.append(normalize_result(data, cv_source, job_text, cv_hash=store_cv_text(cv_text, CV_DIR)))
 
         results.sort(key=lambda r: safe_int(r["overall_score"]), reverse=True)
         st.session_state.ranking_results = results
+        results_changed()
 
         for r in results:
             add_report_to_history(r)
@@ -678,67 +817,91 @@ if analyze:
         with st.spinner("Analyzing pasted CV text..."):
             data = call_openai_json(client, MODEL, job_text, cv_text)
 
-        score = safe_int(data.get("overall_score"), 0)
-        reco = (data.get("recommendation") or "Maybe").strip()
-        subs = data.get("subscores") or {}
-        interview = data.get("interview_guide") or {"critical": [], "nice_to_have": []}
-
-        rid = stable_id(job_text[:160], "pasted_text", str(score), reco)
-        report_text = json_to_markdown_report("Pasted text", data)
-
-        entry = {
-            "id": rid,
-            "timestamp": now_ts(),
-            "cv_source": "Pasted text",
-            "overall_score": score,
-            "recommendation": reco,
-            "subscores": {
-                "skills": safe_int(subs.get("skills"), 0),
-                "experience": safe_int(subs.get("experience"), 0),
-                "tools": safe_int(subs.get("tools"), 0),
-                "domain": safe_int(subs.get("domain"), 0),
-            },
-            "summary": data.get("summary", ""),
-            "missing_keywords": data.get("missing_keywords") or [],
-            "strengths": data.get("strengths") or [],
-            "gaps_risks": data.get("gaps_risks") or [],
-            "interview_guide": {
-                "critical": (interview.get("critical") or []),
-                "nice_to_have": (interview.get("nice_to_have") or []),
-            },
-            "cv_improvements": data.get("cv_improvements") or [],
-            "explainable_score": data.get("explainable_score") or {"why_this_score": [], "top_evidence": []},
-            "recruiter_notes": "",
-            "report_text": report_text,
-        }
+        entry = normalize_result(data, "Pasted text", job_text, id_source="pasted_text", cv_hash=store_cv_text(cv_text, CV_DIR))
 
         st.session_state.ranking_results = [entry]
+        results_changed()
         add_report_to_history(entry)
         st.rerun()
 
 
+if st.session_state.active_job_id:
+    job_progress(st.session_state.active_job_id)
+
+
 
 
 
 if st.session_state.ranking_results:
+    from utils.results_table import missing_keyword_counts, ranked, score_distribution, shortlist
+
     st.divider()
 
-    st.subheader("Shortlist")
     thr = st.session_state.shortlist_threshold
-    shortlist = [r for r in st.session_state.ranking_results if safe_int(r["overall_score"]) >= thr]
+    table = results_table("ranking_results")
+    current_jd = st.session_state.job_text.strip()
+    changes = jd_changes(current_jd) if current_jd else {"fresh": set(table["jd_hash"]), "stale": {}}
+    is_stale = ~table["jd_hash"].isin(changes["fresh"])
+    table = table.assign(status=is_stale.map({True: "stale", False: "fresh"}))
+
+    if changes["stale"]:
+        stale_ids = set(table.loc[is_stale, "id"])
+        stale_entries = [r for r in st.session_state.ranking_results if r["id"] in stale_ids and has_cv_text(r.get("cv_hash"), CV_DIR)]
+        added = sorted({x for d in changes["stale"].values() for x in d["added"]})
+        removed = sorted({x for d in changes["stale"].values() for x in d["removed"]})
+        changed = sorted({
+            f"{c['new']} ("
+            + ", ".join([f"+{w}" for w in c["added_terms"]] + [f"−{w}" for w in c["removed_terms"]])
+            + ")"
+            for d in changes["stale"].values()
+            for c in d["changed"]
+        })
+        subscores = [k for k in ("skills", "experience", "tools", "domain") if any(k in d["subscores"] for d in changes["stale"].values())]
+
+        st.warning(
+            f"The job description changed since {len(stale_ids)} result(s) were scored: "
+            f"{len(added)} requirement(s) added, {len(changed)} changed, {len(removed)} removed"
+            + (f" (affects {', '.join(subscores)})." if subscores else ".")
+        )
+        with st.expander("Requirement changes"):
+            st.markdown("**Added**")
+            render_bullets(added)
+            st.markdown("**Changed**")
+            render_bullets(changed)
+            st.markdown("**Removed**")
+            render_bullets(removed)
+
+        ordered = boundary_order(stale_entries, thr)
+        r1, r2 = st.columns(2)
+        with r1:
+            n_next = min(5, len(ordered))
+            if n_next and st.button(f"Re-score {n_next} nearest the shortlist boundary", use_container_width=True):
+                with st.spinner(f"Re-scoring {n_next} CV(s)..."):
+                    rescore_entries(ordered[:n_next], current_jd)
+                st.rerun()
+        with r2:
+            if ordered and st.button(f"Re-score all stale ({len(ordered)})", use_container_width=True):
+                with st.spinner(f"Re-scoring {len(ordered)} CV(s)..."):
+                    rescore_entries(ordered, current_jd)
+                st.rerun()
+        if len(ordered) < len(stale_ids):
+            st.caption(f"{len(stale_ids) - len(ordered)} stale result(s) have no stored CV text and need a new upload.")
+
+    st.subheader("Shortlist")
+    short = shortlist(table, thr)
     st.caption(f"Auto-shortlist: candidates with score ≥ {thr}")
 
-    if shortlist:
+    if not short.empty:
         st.dataframe(
-            [
-                {
-                    "Score": r["overall_score"],
-                    "Recommendation": r["recommendation"],
-                    "Candidate": r["cv_source"],
-                    "Missing keywords (count)": len(r.get("missing_keywords", [])),
+            short[["overall_score", "recommendation", "cv_source", "missing_count", "status"]].rename(
+                columns={
+                    "overall_score": "Score",
+                    "recommendation": "Recommendation",
+                    "cv_source": "Candidate",
+                    "missing_count": "Missing keywords (count)",
+                    "status": "Status",
                 }
-                for r in shortlist
-            ],
+            ),
             use_container_width=True,
             hide_index=True,
         )
@@ -748,12 +911,19 @@ if st.session_state.ranking_results:
     st.subheader("Ranking & comparison")
     st.caption("Select 2–5 candidates to compare side-by-side.")
 
-    options = [(r["id"], f"{r['overall_score']}/100 • {r['recommendation']} • {r['cv_source']}") for r in st.session_state.ranking_results]
-    id_to_label = {i: lbl for i, lbl in options}
+    order = ranked(table)
+    option_ids = order["id"].tolist()
+    id_to_label = dict(zip(
+        option_ids,
+        (
+            order["overall_score"].astype(str) + "/100 • " + order["recommendation"].astype(str) + " • " + order["cv_source"]
+            + order["status"].map({"stale": " • stale", "fresh": ""})
+        ).tolist(),
+    ))
 
     st.session_state.compare_ids = st.multiselect(
         "Compare candidates",
-        options=[i for i, _ in options],
+        options=option_ids,
         format_func=lambda x: id_to_label.get(x, x),
         default=st.session_state.compare_ids[:5],
         max_selections=5,
@@ -761,7 +931,7 @@ if st.session_state.ranking_results:
 
     open_id = st.selectbox(
         "Open candidate details",
-        options=[i for i, _ in options],
+        options=option_ids,
         format_func=lambda x: id_to_label.get(x, x),
         index=0,
     )
@@ -770,7 +940,8 @@ if st.session_state.ranking_results:
         st.rerun()
 
     if len(st.session_state.compare_ids) >= 2:
-        compare = [next(r for r in st.session_state.ranking_results if r["id"] == cid) for cid in st.session_state.compare_ids]
+        by_id = {r["id"]: r for r in st.session_state.ranking_results}
+        compare = [by_id[cid] for cid in st.session_state.compare_ids if cid in by_id]
         cols = st.columns(len(compare), gap="large")
         for c, r in zip(cols, compare):
             with c:
@@ -784,6 +955,21 @@ if st.session_state.ranking_results:
                 st.markdown("**Missing keywords**")
                 badge_row((r.get("missing_keywords") or [])[:12], limit=12)
 
+    st.subheader("Pool analytics")
+    pool_name = "history" if st.checkbox("Include full history", value=False) else "ranking_results"
+    pool = results_table(pool_name)
+    st.caption(
+        f"{len(pool)} candidates • median score {int(pool['overall_score'].median()) if len(pool) else 0} • "
+        f"{int((pool['overall_score'] >= thr).sum())} at or above threshold"
+    )
+    a1, a2 = st.columns(2, gap="large")
+    with a1:
+        st.markdown("**Most common missing keywords**")
+        st.dataframe(missing_keyword_counts(pool), use_container_width=True, hide_index=True)
+    with a2:
+        st.markdown("**Score distribution**")
+        st.bar_chart(score_distribution(pool), x="score", y="candidates")
+
 
 
 
@@ -0,0 +1,57 @@
+import random
+from typing import Any, Dict
+
+
+SCALES = [1, 10, 100, 1000]
+MODEL = "bench-model"
+
+SKILLS = [
+    "Python", "SQL", "Spark", "Airflow", "dbt", "AWS", "GCP", "Docker", "Kubernetes", "Terraform",
+    "Power BI", "Tableau", "Excel", "Salesforce", "SAP", "Workday", "Scrum", "Kafka", "Snowflake", "React",
+]
+
+JOB_TEXT = """Senior Data Engineer
+
+Responsibilities:
+- Design and operate batch and streaming pipelines
+- Own data models used by analytics and finance
+- Mentor engineers and review designs
+
+Requirements:
+- 5+ years with Python and SQL
+- Spark, Airflow and dbt in production
+- Cloud experience (AWS or GCP), Terraform a plus
+- Stakeholder communication in English
+"""
+
+
+def synthetic_cv(i: int) -> str:
+    rnd = random.Random(i)
+    skills = rnd.sample(SKILLS, 8)
+    lines = [f"Candidate {i}", f"Senior Engineer with {rnd.randint(2, 15)} years of experience", "", "## Experience"]
+    for j in range(rnd.randint(3, 6)):
+        lines.append(f"- Company {j}: built pipelines with {', '.join(rnd.sample(skills, 3))}")
+    lines += ["", "## Skills"] + [f"- {s}" for s in skills]
+    return "\n".join(lines)
+
+
+def synthetic_response(i: int) -> Dict[str, Any]:
+    rnd = random.Random(10_000 + i)
+    return {
+        "overall_score": rnd.randint(20, 98),
+        "recommendation": rnd.choice(["Strong Yes", "Yes", "Maybe", "No"]),
+        "subscores": {k: rnd.randint(0, 100) for k in ("skills", "experience", "tools", "domain")},
+        "explainable_score": {
+            "why_this_score": [f"Reason {k} for candidate {i}" for k in range(3)],
+            "top_evidence": [f"Evidence {k}: used {rnd.choice(SKILLS)}" for k in range(3)],
+        },
+        "strengths": [f"Strong {s}" for s in rnd.sample(SKILLS, 4)],
+        "gaps_risks": [f"Limited {s}" for s in rnd.sample(SKILLS, 3)],
+        "missing_keywords": rnd.sample(SKILLS, rnd.randint(0, 6)),
+        "interview_guide": {
+            "critical": [f"Probe depth in {s}" for s in rnd.sample(SKILLS, 2)],
+            "nice_to_have": [f"Ask about {s}" for s in rnd.sample(SKILLS, 2)],
+        },
+        "cv_improvements": ["Quantify impact", "List certifications"],
+        "summary": f"Candidate {i} is a plausible match with some tooling gaps.",
+    }
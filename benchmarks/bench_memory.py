@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import argparse
+import resource
+import subprocess
+from io import BytesIO
+from datetime import datetime
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+HERE = Path(__file__).resolve().parent
+RESULTS = Path(__file__).resolve().parent / "results" / "memory.jsonl"
+
+JOB_TEXT = "Senior Data Engineer. Requirements: Python, SQL, Spark, Airflow, dbt, AWS."
+# The app polls a running job every 2 s; this many polls are replayed before the results are loaded.
+UI_POLLS = 10
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def fake_uploads(n: int, size: int, sample: bytes = None):
+    # Streamlit keeps every uploaded file in memory for the whole run, so all n buffers are alive at once.
+    line = b"Experienced engineer. Python, SQL, Spark, Airflow, dbt and AWS in production. " * 8 + b"\n"
+    uploads = []
+    for i in range(n):
+        data = sample if sample is not None else (line * (size // len(line) + 1))[:size]
+        f = BytesIO()
+        f.write(data)
+        uploads.append({"name": f"cv_{i}.pdf" if sample else f"cv_{i}", "kind": "file" if sample else "text", "file": f, "size": len(data)})
+    return uploads
+
+
+class SyntheticClient:
+    # Answers every prompt with a realistic scoring response, so results are as large as real ones.
+    def __init__(self):
+        from types import SimpleNamespace
+
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages, **kwargs):
+        from bench_data import synthetic_response
+        from utils.replay import fake_completion
+
+        self.calls += 1
+        return fake_completion(json.dumps(synthetic_response(self.calls)), model)
+
+
+def child(phase: str, db_path: str, n: int, size: int, sample_path: str):
+    sys.path.insert(0, str(ROOT))
+    sys.path.insert(0, str(HERE))
+    import utils.job_queue as jq
+
+    out = {}
+    if phase == "submit":
+        sample = Path(sample_path).read_bytes() if sample_path else None
+        jq.submit_job(JOB_TEXT, "bench-model", fake_uploads(n, size, sample), db_path)
+    elif phase == "worker":
+        jq.make_client = SyntheticClient
+        jq.run_worker(db_path, idle_exit=0, poll=0.05)
+    else:
+        # What the Streamlit process does: poll progress, then load the finished job into the session.
+        from utils.results_table import results_frame
+
+        job_id = jq.list_jobs(limit=1, db_path=db_path)[0]["id"]
+        for _ in range(UI_POLLS):
+            jq.job_status(job_id, db_path)
+            jq.job_summaries(job_id, db_path)
+        results = jq.job_results(job_id, db_path)
+        results_frame(results)
+        out["scored"] = sum(1 for r in results if r.get("cv_hash"))
+
+    out["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(out))
+
+
+def run_phase(phase: str, db_path: str, n: int, size: int, sample_path: str, cv_dir: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", phase, "--db", db_path, "--n", str(n), "--size", str(size), "--sample", sample_path or ""],
+        cwd=ROOT,
+        env=dict(os.environ, TMA_CV_DIR=cv_dir),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of job submission, scoring and loading results as batch size grows")
+    parser.add_argument("--sizes", default="10,50,200", help="comma-separated batch sizes")
+    parser.add_argument("--size", type=int, default=2 << 20, help="bytes per synthetic upload")
+    parser.add_argument("--sample", default="", help="real CV file (PDF/DOCX) to repeat instead of synthetic text")
+    parser.add_argument("--label", default="")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--child", choices=["submit", "worker", "ui"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--n", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.db, args.n, args.size, args.sample)
+        return
+
+    if args.sample:
+        import importlib.util
+
+        sys.path.insert(0, str(ROOT))
+        if importlib.util.find_spec("utils.cv_extract") is None:
+            parser.error("--sample needs utils.cv_extract to turn the file into text; without it every CV is an extraction error")
+
+    import tempfile
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(x) for x in args.sizes.split(",")]:
+            db_path = os.path.join(tmp, f"jobs_{n}.sqlite3")
+            cv_dir = os.path.join(tmp, f"cv_text_{n}")
+            submit = run_phase("submit", db_path, n, args.size, args.sample, cv_dir)
+            worker = run_phase("worker", db_path, n, args.size, args.sample, cv_dir)
+            ui = run_phase("ui", db_path, n, args.size, args.sample, cv_dir)
+            rows.append({
+                "cvs": n,
+                "scored": ui["scored"],
+                "upload_mb": round(n * (os.path.getsize(args.sample) if args.sample else args.size) / (1 << 20), 1),
+                "submit_peak_rss_mb": submit["peak_rss_mb"],
+                "worker_peak_rss_mb": worker["peak_rss_mb"],
+                "ui_peak_rss_mb": ui["peak_rss_mb"],
+            })
+
+    for r in rows:
+        print(
+            f"{r['cvs']:>6} CVs ({r['scored']} scored)  {r['upload_mb']:>8} MB uploaded  "
+            f"submit {r['submit_peak_rss_mb']:>7} MB  worker {r['worker_peak_rss_mb']:>7} MB  ui {r['ui_peak_rss_mb']:>7} MB"
+        )
+
+    if not args.no_save:
+        RESULTS.parent.mkdir(parents=True, exist_ok=True)
+        record = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "label": args.label, "rows": rows}
+        with RESULTS.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
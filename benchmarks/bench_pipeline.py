@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from bench_data import MODEL, SCALES
+from utils.exports import build_full_text_with_notes, make_docx_bytes, make_pdf_bytes
+from utils.results_table import missing_keyword_counts, results_frame, score_distribution, shortlist
+from utils.scoring import (
+    build_messages,
+    call_openai_json,
+    json_to_markdown_report,
+    normalize_result,
+    parse_json_content,
+)
+
+
+def heavy_rounds(n: int) -> int:
+    if n >= 1000:
+        return 1
+    return 3 if n >= 100 else 10
+
+
+@pytest.fixture(scope="session")
+def reports(job_text, responses):
+    return [normalize_result(data, f"cv_{i}.pdf", job_text) for i, data in enumerate(responses)]
+
+
+@pytest.fixture(scope="session")
+def cv_extract():
+    return pytest.importorskip("utils.cv_extract")
+
+
+@pytest.fixture(scope="session")
+def cv_files(cv_extract, cvs):
+    files = []
+    for i, text in enumerate(cvs):
+        if i % 2:
+            files.append((f"cv_{i}.docx", make_docx_bytes(f"Candidate {i}", "", text)))
+        else:
+            files.append((f"cv_{i}.pdf", make_pdf_bytes(f"Candidate {i}", "", text)))
+    return files
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_extract(benchmark, cv_extract, cv_files, n):
+    batch = cv_files[:n]
+
+    def run():
+        return [cv_extract.extract_cv_text(name, data) for name, data in batch]
+
+    out = benchmark.pedantic(run, rounds=heavy_rounds(n), iterations=1)
+    assert len(out) == n
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_prompt_build(benchmark, job_text, cvs, n):
+    batch = cvs[:n]
+    out = benchmark(lambda: [build_messages(job_text, cv) for cv in batch])
+    assert len(out) == n
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_parse_and_normalize(benchmark, job_text, responses, n):
+    raw = [json.dumps(r) for r in responses[:n]]
+
+    def run():
+        return [normalize_result(parse_json_content(c), f"cv_{i}.pdf", job_text) for i, c in enumerate(raw)]
+
+    out = benchmark(run)
+    assert len(out) == n
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_replay_score(benchmark, replay_client, job_text, cvs, n):
+    batch = cvs[:n]
+
+    def run():
+        return [
+            normalize_result(call_openai_json(replay_client, MODEL, job_text, cv), f"cv_{i}.pdf", job_text)
+            for i, cv in enumerate(batch)
+        ]
+
+    out = benchmark(run)
+    assert len(out) == n
+    assert replay_client.misses == 0
+
+
+@pytest.mark.parametrize("n", SCALES)
+def test_markdown_render(benchmark, responses, n):
+    batch = responses[:n]
+    out = benchmark(lambda: [json_to_markdown_report(f"cv_{i}.pdf", d) for i, d in enumerate(batch)])
+    assert len(out) == n
+
+
+@pytest.mark.parametrize("kind", ["pdf", "docx"])
+@pytest.mark.parametrize("n", SCALES)
+def test_export(benchmark, reports, kind, n):
+    make = make_pdf_bytes if kind == "pdf" else make_docx_bytes
+    batch = [build_full_text_with_notes(r) for r in reports[:n]]
+
+    def run():
+        return [make("Talent Match Assistant", "bench", body) for body in batch]
+
+    out = benchmark.pedantic(run, rounds=heavy_rounds(n), iterations=1)
+    assert len(out) == n
+
+
+@pytest.mark.parametrize("n", [100, 1000, 10000])
+def test_results_table(benchmark, reports, n):
+    pool = (reports * (n // len(reports) + 1))[:n]
+
+    def run():
+        df = results_frame(pool)
+        return shortlist(df, 75), missing_keyword_counts(df), score_distribution(df)
+
+    short, keywords, dist = benchmark(run)
+    assert int(dist["candidates"].sum()) == n
@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+RESULTS = Path(__file__).resolve().parent / "results" / "startup.jsonl"
+
+# Runs in a fresh interpreter so module imports are measured as on a cold server start.
+COLD_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.run()
+t1 = time.perf_counter()
+assert not at.exception, at.exception
+print(t1 - t0)
+"""
+
+
+def bench_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-bench")
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def cold_start(runs: int) -> list:
+    out = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", COLD_SNIPPET.format(app=str(APP))],
+            cwd=ROOT,
+            env=bench_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        out.append(float(proc.stdout.strip().splitlines()[-1]))
+    return out
+
+
+def reruns(runs: int) -> list:
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.update(bench_env())
+    at = AppTest.from_file(str(APP), default_timeout=60)
+    at.run()
+
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        at.run()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def summarize(samples: list) -> dict:
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 2),
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start and rerun timing for app.py")
+    parser.add_argument("--cold", type=int, default=3, help="cold start runs (fresh interpreter each)")
+    parser.add_argument("--reruns", type=int, default=20, help="in-process reruns after a warm start")
+    parser.add_argument("--label", default="", help="free-form tag stored with the result (e.g. git sha)")
+    parser.add_argument("--no-save", action="store_true", help="print only, do not append to results")
+    args = parser.parse_args()
+
+    record = {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "label": args.label,
+        "python": sys.version.split()[0],
+        "cold_start": summarize(cold_start(args.cold)),
+        "rerun": summarize(reruns(args.reruns)),
+    }
+    print(json.dumps(record, indent=2))
+
+    if not args.no_save:
+        RESULTS.parent.mkdir(parents=True, exist_ok=True)
+        with RESULTS.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import sys
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench_data import JOB_TEXT, MODEL, SCALES, synthetic_cv, synthetic_response  # noqa: E402
+from utils.replay import ReplayClient  # noqa: E402
+from utils.scoring import JSON_MODE_PARAMS, build_messages  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def job_text() -> str:
+    return JOB_TEXT
+
+
+@pytest.fixture(scope="session")
+def cvs() -> List[str]:
+    return [synthetic_cv(i) for i in range(max(SCALES))]
+
+
+@pytest.fixture(scope="session")
+def responses() -> List[Dict[str, Any]]:
+    return [synthetic_response(i) for i in range(max(SCALES))]
+
+
+@pytest.fixture(scope="session")
+def replay_client(job_text, cvs, responses) -> ReplayClient:
+    client = ReplayClient()
+    for cv_text, data in zip(cvs, responses):
+        client.add(MODEL, build_messages(job_text, cv_text), json.dumps(data), **JSON_MODE_PARAMS)
+    return client
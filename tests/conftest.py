@@ -0,0 +1,58 @@
+import sys
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.replay import ReplayClient  # noqa: E402
+from utils.scoring import JSON_MODE_PARAMS, build_messages  # noqa: E402
+
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "dbt", "AWS", "Kafka", "Terraform"]
+POOL = 8
+
+
+@pytest.fixture(scope="session")
+def model() -> str:
+    return "test-model"
+
+
+@pytest.fixture(scope="session")
+def job_text() -> str:
+    return "Senior Data Engineer\n\nRequirements:\n- 5+ years with Python and SQL\n- Spark, Airflow and dbt in production\n- AWS"
+
+
+@pytest.fixture(scope="session")
+def cvs() -> List[str]:
+    return [
+        f"Candidate {i}\nData engineer with {3 + i} years of experience\n\nSkills: {', '.join(SKILLS[i:] + SKILLS[:i])}"
+        for i in range(POOL)
+    ]
+
+
+@pytest.fixture(scope="session")
+def responses() -> List[Dict[str, Any]]:
+    return [
+        {
+            "overall_score": 45 + 6 * i,
+            "recommendation": ["No", "Maybe", "Yes", "Strong Yes"][i % 4],
+            "subscores": {"skills": 50 + i, "experience": 40 + 2 * i, "tools": 60, "domain": 30 + i},
+            "strengths": [f"Strong {SKILLS[i]}"],
+            "gaps_risks": [f"Limited {SKILLS[-1 - i]}"],
+            "missing_keywords": SKILLS[i : i + 2],
+            "summary": f"Candidate {i} is a plausible match.",
+        }
+        for i in range(POOL)
+    ]
+
+
+@pytest.fixture(scope="session")
+def replay_client(model, job_text, cvs, responses) -> ReplayClient:
+    client = ReplayClient()
+    for cv_text, data in zip(cvs, responses):
+        client.add(model, build_messages(job_text, cv_text), json.dumps(data), **JSON_MODE_PARAMS)
+    return client
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from utils.batch_mode import (
+    LocalBatchClient,
+    collect_batch,
+    collectable,
+    list_batches,
+    load_manifest,
+    purge_batches,
+    save_manifest,
+    submit_batch,
+    to_jsonl,
+    wait_for_batch,
+)
+from utils.cv_store import store_cv_text
+
+
+@pytest.fixture
+def cv_dir(tmp_path):
+    return str(tmp_path / "cv_text")
+
+
+@pytest.fixture
+def batch_cvs(cvs, cv_dir):
+    return [{"cv_source": f"cv_{i}.pdf (PDF)", "cv_hash": store_cv_text(text, cv_dir)} for i, text in enumerate(cvs[:6])]
+
+
+@pytest.fixture
+def batch_client(tmp_path, replay_client):
+    return LocalBatchClient(str(tmp_path / "local"), replay_client)
+
+
+def test_batch_round_trip_maps_results_back_to_cvs(tmp_path, batch_client, model, job_text, batch_cvs, responses, cv_dir):
+    batch_dir = tmp_path / "batches"
+    manifest = submit_batch(batch_client, job_text, model, batch_cvs, batch_dir=batch_dir, cv_dir=cv_dir)
+    assert not collectable(manifest)
+
+    input_file = batch_client.root / manifest["input_file_id"]
+    assert input_file.exists()
+    manifest = wait_for_batch(batch_client, manifest, poll_every=0, batch_dir=batch_dir)
+    assert manifest["status"] == "completed"
+    assert manifest["input_file_id"] is None and not input_file.exists()
+    assert (manifest["completed"], manifest["failed"]) == (6, 0)
+    assert load_manifest(manifest["batch_id"], batch_dir)["status"] == "completed"
+    assert list_batches(batch_dir)[0]["batch_id"] == manifest["batch_id"]
+
+    collected = collect_batch(batch_client, manifest)
+    assert collected["failures"] == []
+    by_source = {r["cv_source"]: r for r in collected["results"]}
+    for i, cv in enumerate(batch_cvs):
+        assert by_source[cv["cv_source"]]["overall_score"] == responses[i]["overall_score"]
+        assert by_source[cv["cv_source"]]["cv_hash"] == cv["cv_hash"]
+    assert all("cv_text" not in c for c in manifest["cvs"])
+
+
+def test_extraction_errors_and_failed_requests_are_reported(tmp_path, batch_client, model, job_text, batch_cvs, cv_dir):
+    batch_dir = tmp_path / "batches"
+    cvs = batch_cvs[:2] + [{"cv_source": "unknown.pdf (PDF)", "cv_hash": store_cv_text("not in the cassette", cv_dir)}]
+    errors = [{"cv_source": "broken.pdf", "overall_score": 0}]
+    manifest = submit_batch(batch_client, job_text, model, cvs, errors, batch_dir=batch_dir, cv_dir=cv_dir)
+    manifest = wait_for_batch(batch_client, manifest, poll_every=0, batch_dir=batch_dir)
+
+    collected = collect_batch(batch_client, manifest)
+    assert sorted(r["cv_source"] for r in collected["results"]) == ["broken.pdf", "cv_0.pdf (PDF)", "cv_1.pdf (PDF)"]
+    assert [f["cv_source"] for f in collected["failures"]] == ["unknown.pdf (PDF)"]
+
+
+def test_expired_batch_with_partial_output_can_be_collected(tmp_path, batch_client, model, job_text, batch_cvs, responses, cv_dir):
+    batch_dir = tmp_path / "batches"
+    manifest = submit_batch(batch_client, job_text, model, batch_cvs, batch_dir=batch_dir, cv_dir=cv_dir)
+
+    # Only the first two requests finished before the 24h window closed.
+    done = [
+        {
+            "custom_id": f"cv-{i}",
+            "response": {"status_code": 200, "body": {"choices": [{"message": {"content": json.dumps(responses[i])}}]}},
+            "error": None,
+        }
+        for i in range(2)
+    ]
+    output = batch_client.files.create(file=("output.jsonl", to_jsonl(done)), purpose="batch_output")
+    manifest.update(status="expired", output_file_id=output.id, completed=2)
+    save_manifest(manifest, batch_dir)
+
+    picked = list_batches(batch_dir)[0]
+    assert collectable(picked)
+
+    collected = collect_batch(batch_client, load_manifest(manifest["batch_id"], batch_dir))
+    assert [r["cv_source"] for r in collected["results"]] == [cv["cv_source"] for cv in batch_cvs[:2]]
+    assert [f["cv_source"] for f in collected["failures"]] == [cv["cv_source"] for cv in batch_cvs[2:]]
+    assert all("expired" in f["error"] for f in collected["failures"])
+
+
+def test_purge_drops_old_final_batches_and_their_files(tmp_path, batch_client, model, job_text, batch_cvs, cv_dir):
+    batch_dir = tmp_path / "batches"
+    done = submit_batch(batch_client, job_text, model, batch_cvs, batch_dir=batch_dir, cv_dir=cv_dir)
+    done = wait_for_batch(batch_client, done, poll_every=0, batch_dir=batch_dir)
+    pending = submit_batch(batch_client, job_text, model, batch_cvs, batch_dir=batch_dir, cv_dir=cv_dir)
+    for m in (done, pending):
+        m["created_at"] = "2000-01-01 00:00:00"
+        save_manifest(m, batch_dir)
+
+    assert purge_batches(batch_client, 30, batch_dir) == 1
+    assert [b["batch_id"] for b in list_batches(batch_dir)] == [pending["batch_id"]]
+    assert not (batch_client.root / done["output_file_id"]).exists()
+    assert (batch_client.root / pending["input_file_id"]).exists()
+
+
+def test_final_batch_without_output_is_not_collectable():
+    assert not collectable({"status": "failed", "output_file_id": None, "error_file_id": None})
+    assert not collectable({"status": "in_progress", "output_file_id": "file-1", "error_file_id": None})
@@ -0,0 +1,33 @@
+import os
+import time
+
+from utils.cv_store import delete_cv_text, has_cv_text, load_cv_text, store_cv_text, sweep_cv_text
+
+
+def test_store_is_keyed_by_content(tmp_path):
+    cv_dir = str(tmp_path)
+    h = store_cv_text("Jane Doe\nPython, SQL", cv_dir)
+    assert store_cv_text("Jane Doe\nPython, SQL", cv_dir) == h
+    assert load_cv_text(h, cv_dir) == "Jane Doe\nPython, SQL"
+    assert load_cv_text(None, cv_dir) is None
+
+
+def test_delete_removes_only_the_given_texts(tmp_path):
+    cv_dir = str(tmp_path)
+    keep, drop = store_cv_text("keep", cv_dir), store_cv_text("drop", cv_dir)
+    assert delete_cv_text([drop, drop, None, "0" * 64], cv_dir) == 1
+    assert has_cv_text(keep, cv_dir) and not has_cv_text(drop, cv_dir)
+
+
+def test_sweep_removes_texts_unused_for_the_retention_window(tmp_path):
+    cv_dir = str(tmp_path)
+    old, reused, fresh = (store_cv_text(t, cv_dir) for t in ("old", "reused", "fresh"))
+    month_ago = time.time() - 31 * 86400
+    for h in (old, reused):
+        path = tmp_path / h[:2] / f"{h}.txt"
+        os.utime(path, (month_ago, month_ago))
+
+    # Storing a CV again refreshes it.
+    store_cv_text("reused", cv_dir)
+    assert sweep_cv_text(30, cv_dir) == 1
+    assert [has_cv_text(h, cv_dir) for h in (old, reused, fresh)] == [False, True, True]
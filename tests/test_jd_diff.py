@@ -0,0 +1,92 @@
+from utils.jd_diff import boundary_order, diff_requirements, split_requirements
+
+TOOLS = "Experience with AWS, Docker, Kubernetes, Terraform, Airflow, Spark and dbt"
+
+
+def test_adding_a_tool_to_a_list_is_a_real_change():
+    d = diff_requirements(TOOLS, TOOLS.replace(" and dbt", ", dbt and Snowflake"))
+    assert not d["cosmetic"]
+    assert d["added"] == [] and d["removed"] == []
+    assert [c["added_terms"] for c in d["changed"]] == [["snowflake"]]
+    assert "tools" in d["subscores"]
+
+
+def test_removing_a_tool_from_a_list_is_a_real_change():
+    d = diff_requirements(TOOLS, TOOLS.replace("Terraform, ", ""))
+    assert not d["cosmetic"]
+    assert [c["removed_terms"] for c in d["changed"]] == [["terraform"]]
+
+
+def test_changing_years_is_a_real_change():
+    d = diff_requirements("- 5+ years with Python and SQL", "- 7+ years with Python and SQL")
+    assert not d["cosmetic"]
+    assert d["changed"][0]["added_terms"] == ["7+"]
+    assert d["changed"][0]["removed_terms"] == ["5+"]
+    assert "experience" in d["subscores"]
+
+
+def test_cosmetic_edits_keep_results_fresh():
+    old = """Requirements:
+- 5+ years with Python and SQL
+- Strong stakeholder communication
+- Spark, Airflow and dbt in production
+"""
+    new = """REQUIREMENTS:
+* Excellent stakeholder communication.
+* 5+ Years with SQL and python
+* Spark, dbt and Airflow in production
+"""
+    d = diff_requirements(old, new)
+    assert d["cosmetic"], d
+
+
+def test_rewording_a_sentence_is_cosmetic():
+    rewordings = [
+        ("Experience with Python and SQL", "Hands-on experience with Python and SQL"),
+        ("You will build data pipelines for the finance team", "You'll be building data pipelines for the finance team"),
+        ("Work closely with analysts and product managers", "Collaborate closely with analysts and product managers"),
+        ("5+ years experience", "At least 5 years of experience"),
+        ("Communicate clearly with stakeholders", "Explain trade-offs to non-technical stakeholders"),
+    ]
+    for old, new in rewordings:
+        d = diff_requirements(f"Requirements:\n- {old}\n- Spark and dbt", f"Requirements:\n- {new}\n- Spark and dbt")
+        assert d["cosmetic"], (old, new, d)
+
+
+def test_reworded_line_that_adds_a_qualification_is_a_real_change():
+    d = diff_requirements("- Communicate clearly with stakeholders", "- Communicate clearly with stakeholders in German")
+    assert not d["cosmetic"]
+    assert d["changed"][0]["added_terms"] == ["german"]
+
+
+def test_plural_and_tense_are_cosmetic():
+    assert diff_requirements("Experience with BI tools", "Experienced with BI tool")["cosmetic"]
+
+
+def test_new_soft_skill_line_is_still_added():
+    d = diff_requirements("- Python", "- Python\n- Comfortable presenting to executives")
+    assert d["added"] == ["Comfortable presenting to executives"]
+
+
+def test_added_and_removed_lines():
+    d = diff_requirements("- Python\n- Kafka", "- Python\n- German (fluent)")
+    assert d["added"] == ["German (fluent)"]
+    assert d["removed"] == ["Kafka"]
+    assert d["changed"] == []
+
+
+def test_unchanged_line_keeps_its_exact_counterpart():
+    old = "- Python and SQL\n- Python, SQL and Spark"
+    new = "- Python, SQL and Spark\n- Python and SQL\n- Python and Go"
+    d = diff_requirements(old, new)
+    assert d["changed"] == []
+    assert d["added"] == ["Python and Go"]
+
+
+def test_split_requirements_skips_headings_and_splits_sentences():
+    assert split_requirements("Requirements:\n- Python. SQL; Spark\n\n") == ["Python.", "SQL;", "Spark"]
+
+
+def test_boundary_order_puts_nearest_the_threshold_first():
+    results = [{"overall_score": s} for s in (95, 40, 74, 80, 10)]
+    assert [r["overall_score"] for r in boundary_order(results, 75)] == [74, 80, 95, 40, 10]
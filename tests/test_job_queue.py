@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import signal
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+import utils.job_queue as jq
+from utils.cv_store import load_cv_text
+from utils.replay import ReplayClient, request_key
+from utils.scoring import JSON_MODE_PARAMS, build_messages
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A worker that takes a while per CV, so the test can kill it mid-job.
+SLOW_WORKER = """
+import sys, time
+sys.path.insert(0, {root!r})
+import utils.job_queue as jq
+from utils.replay import ReplayClient
+
+score = jq.call_openai_json
+
+def slow(*args, **kwargs):
+    time.sleep(0.3)
+    return score(*args, **kwargs)
+
+jq.call_openai_json = slow
+jq.make_client = lambda: ReplayClient({cassette!r})
+jq.run_worker({db!r}, idle_exit=0, poll=0.05, cv_dir={cv_dir!r})
+"""
+
+
+@pytest.fixture
+def cassette(tmp_path, model, job_text, cvs, responses):
+    path = tmp_path / "cassette.jsonl"
+    with path.open("w", encoding="utf-8") as fh:
+        for cv_text, data in zip(cvs[:8], responses):
+            messages = build_messages(job_text, cv_text)
+            fh.write(json.dumps({"key": request_key(model, messages, JSON_MODE_PARAMS), "content": json.dumps(data)}) + "\n")
+    return str(path)
+
+
+def text_items(cvs, n):
+    return [{"name": f"cv_{i}", "kind": "text", "payload": cv.encode("utf-8")} for i, cv in enumerate(cvs[:n])]
+
+
+def item_rows(db_path, job_id):
+    conn = jq.connect(db_path)
+    try:
+        rows = conn.execute("SELECT idx, status, result, finished_at FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,))
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def test_killed_worker_is_resumed_without_rescoring(tmp_path, monkeypatch, model, job_text, cvs, cassette):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    cv_dir = str(tmp_path / "cv_text")
+    job_id = jq.submit_job(job_text, model, text_items(cvs, 8), db_path)
+
+    proc = subprocess.Popen([sys.executable, "-c", SLOW_WORKER.format(root=ROOT, cassette=cassette, db=db_path, cv_dir=cv_dir)])
+    try:
+        deadline = time.time() + 30
+        while jq.job_status(job_id, db_path)["completed"] < 2:
+            assert time.time() < deadline, "worker never finished a CV"
+            assert proc.poll() is None, "worker exited early"
+            time.sleep(0.05)
+    finally:
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+
+    before = {r["idx"]: r for r in item_rows(db_path, job_id) if r["status"] == "done"}
+    assert 2 <= len(before) < 8
+    assert jq.job_status(job_id, db_path)["status"] == "running"
+
+    # The dead worker's heartbeat counts as stale straight away.
+    monkeypatch.setattr(jq, "STALE_AFTER", 0.0)
+    client = ReplayClient(cassette)
+    monkeypatch.setattr(jq, "make_client", lambda: client)
+    jq.run_worker(db_path, idle_exit=0, poll=0.01, cv_dir=cv_dir)
+
+    job = jq.job_status(job_id, db_path)
+    assert job["status"] == "done"
+    assert job["completed"] == 8
+    assert client.calls == 8 - len(before)
+
+    after = item_rows(db_path, job_id)
+    assert all(r["status"] == "done" for r in after)
+    for idx, row in before.items():
+        assert after[idx]["finished_at"] == row["finished_at"]
+        assert after[idx]["result"] == row["result"]
+
+    # Results carry a hash of the CV text; the text itself is kept once, outside the results.
+    results = jq.job_results(job_id, db_path)
+    assert all("cv_text" not in r for r in results)
+    assert [load_cv_text(r["cv_hash"], cv_dir) for r in results] == cvs[:8]
+
+    summaries = jq.job_summaries(job_id, db_path)
+    assert [s["overall_score"] for s in summaries] == sorted((r["overall_score"] for r in results), reverse=True)
+
+
+def test_failed_items_can_be_retried(tmp_path, monkeypatch, model, job_text, cvs, cassette):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    items = text_items(cvs, 3) + [{"name": "unknown", "kind": "text", "payload": b"not in the cassette"}]
+    job_id = jq.submit_job(job_text, model, items, db_path)
+
+    monkeypatch.setattr(jq, "make_client", lambda: ReplayClient(cassette))
+    jq.run_worker(db_path, idle_exit=0, poll=0.01, cv_dir=str(tmp_path / "cv_text"))
+
+    job = jq.job_status(job_id, db_path)
+    assert (job["completed"], job["failed"]) == (3, 1)
+    assert [f["name"] for f in jq.job_failures(job_id, db_path)] == ["unknown"]
+
+    jq.retry_failed(job_id, db_path)
+    job = jq.job_status(job_id, db_path)
+    assert (job["status"], job["failed"]) == ("queued", 0)
+    assert jq.job_failures(job_id, db_path) == []
+
+
+def test_purge_drops_old_finished_jobs_only(tmp_path, model, job_text, cvs):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    old_done, old_queued, recent = (jq.submit_job(job_text, model, text_items(cvs, 2), db_path) for _ in range(3))
+    conn = jq.connect(db_path)
+    try:
+        conn.execute("UPDATE jobs SET created_at = '2000-01-01 00:00:00' WHERE id IN (?, ?)", (old_done, old_queued))
+        conn.execute("UPDATE jobs SET status = 'done' WHERE id IN (?, ?)", (old_done, recent))
+    finally:
+        conn.close()
+
+    assert jq.purge_jobs(30, db_path) == 1
+    assert jq.job_status(old_done, db_path) is None
+    assert item_rows(db_path, old_done) == []
+    assert {j["id"] for j in jq.list_jobs(db_path=db_path)} == {old_queued, recent}
+
+
+def test_back_to_back_calls_start_one_worker(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    started = []
+
+    def fake_popen(*args, **kwargs):
+        started.append(args)
+        return SimpleNamespace(pid=40_000 + len(started))
+
+    monkeypatch.setattr(jq.subprocess, "Popen", fake_popen)
+
+    # The submit, the sidebar and the progress poll can all run before the first worker registers itself.
+    assert [jq.ensure_workers(db_path, 1) for _ in range(3)] == [1, 0, 0]
+    assert len(started) == 1
+
+    # A registration whose heartbeat went stale (the worker died) is replaced.
+    monkeypatch.setattr(jq, "STALE_AFTER", 0.0)
+    assert jq.ensure_workers(db_path, 1) == 1
+    assert jq.ensure_workers(db_path, 2) == 2
+    assert len(started) == 4
+
+
+def test_cancelled_job_is_not_claimed(tmp_path, model, job_text, cvs):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    job_id = jq.submit_job(job_text, model, text_items(cvs, 2), db_path)
+    jq.cancel_job(job_id, db_path)
+
+    conn = jq.connect(db_path)
+    try:
+        assert jq.claim_job(conn, os.getpid()) is None
+    finally:
+        conn.close()
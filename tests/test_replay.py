@@ -0,0 +1,34 @@
+import json
+from types import SimpleNamespace
+
+from utils.replay import RecordingClient, ReplayClient, fake_completion, request_key
+from utils.scoring import JSON_MODE_PARAMS
+
+MESSAGES = [{"role": "user", "content": "Score this CV"}]
+
+
+def test_json_mode_and_fallback_are_recorded_separately(tmp_path):
+    def create(model, messages, **kwargs):
+        return fake_completion("json" if "response_format" in kwargs else "plain", model)
+
+    path = tmp_path / "run.jsonl"
+    inner = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    recorder = RecordingClient(inner, str(path))
+    recorder.chat.completions.create(model="m", messages=MESSAGES, **JSON_MODE_PARAMS)
+    recorder.chat.completions.create(model="m", messages=MESSAGES, temperature=0.2)
+
+    replay = ReplayClient(str(path))
+    assert replay.chat.completions.create(model="m", messages=MESSAGES, **JSON_MODE_PARAMS).choices[0].message.content == "json"
+    assert replay.chat.completions.create(model="m", messages=MESSAGES, temperature=0.2).choices[0].message.content == "plain"
+
+
+def test_recordings_keyed_without_params_still_replay(tmp_path):
+    path = tmp_path / "old.jsonl"
+    old_key = "0" * 64
+    record = {"key": old_key, "model": "m", "messages": MESSAGES, "params": JSON_MODE_PARAMS, "content": "{}"}
+    path.write_text(json.dumps(record) + "\n", encoding="utf-8")
+
+    replay = ReplayClient(str(path))
+    assert list(replay.records) == [request_key("m", MESSAGES, JSON_MODE_PARAMS)]
+    replay.chat.completions.create(model="m", messages=MESSAGES, **JSON_MODE_PARAMS)
+    assert replay.misses == 0
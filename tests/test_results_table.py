@@ -0,0 +1,50 @@
+from utils.results_table import missing_keyword_counts, ranked, results_frame, score_distribution, shortlist
+
+
+def entry(i, score, skills=0, experience=0, missing=()):
+    return {
+        "id": f"c{i}",
+        "overall_score": score,
+        "subscores": {"skills": skills, "experience": experience},
+        "missing_keywords": list(missing),
+    }
+
+
+def test_ties_are_broken_by_skills_then_experience():
+    df = results_frame([
+        entry(0, 80, skills=70, experience=90),
+        entry(1, 80, skills=75, experience=10),
+        entry(2, 80, skills=70, experience=95),
+        entry(3, 85),
+        entry(4, "80", skills="75", experience="10"),
+    ])
+    assert list(ranked(df)["id"]) == ["c3", "c1", "c4", "c2", "c0"]
+    assert list(shortlist(df, 81)["id"]) == ["c3"]
+
+
+def test_keywords_are_counted_once_per_candidate_ignoring_case():
+    df = results_frame([
+        entry(0, 50, missing=["Kafka", "kafka", " KAFKA "]),
+        entry(1, 50, missing=["kafka", "Go"]),
+        entry(2, 50, missing=["go", ""]),
+        entry(3, 50, missing=["Terraform"]),
+    ])
+    counts = missing_keyword_counts(df)
+    assert list(zip(counts["keyword"], counts["candidates"])) == [("Kafka", 2), ("Go", 2), ("Terraform", 1)]
+
+
+def test_top_bin_includes_100():
+    df = results_frame([entry(i, s) for i, s in enumerate((89, 90, 99, 100, 0, 9, 10))])
+    dist = dict(zip(score_distribution(df)["score"], score_distribution(df)["candidates"]))
+    assert dist["90–100"] == 3
+    assert dist["80–89"] == 1
+    assert (dist["0–9"], dist["10–19"]) == (2, 1)
+    assert sum(dist.values()) == 7
+
+
+def test_empty_pool():
+    df = results_frame([])
+    assert ranked(df).empty and shortlist(df, 75).empty
+    assert missing_keyword_counts(df).empty
+    dist = score_distribution(df)
+    assert len(dist) == 10 and dist["candidates"].sum() == 0
@@ -0,0 +1,75 @@
+import pytest
+
+from utils.scoring import normalize_result
+from utils.session_io import (
+    SESSION_MAGIC,
+    SESSION_VERSION,
+    content_hash,
+    dump_session,
+    load_session,
+    merge_history,
+    resolve_ranking,
+)
+
+
+@pytest.fixture
+def entries(job_text, responses):
+    return [normalize_result(data, f"cv_{i}.pdf", job_text) for i, data in enumerate(responses[:5])]
+
+
+def test_round_trip_keeps_history_ranking_and_settings(entries):
+    ranking = sorted(entries[:3], key=lambda r: r["overall_score"], reverse=True)
+    blob = dump_session(entries, ranking, selected_id=entries[1]["id"], job_text="JD", shortlist_threshold=60, jd_versions={"abc": "JD"})
+
+    payload = load_session(blob)
+    assert [h["content_hash"] for h in payload["history"]] == [e["content_hash"] for e in entries]
+    assert [r["id"] for r in resolve_ranking(payload["history"], payload["ranking"])] == [r["id"] for r in ranking]
+    assert payload["selected_id"] == entries[1]["id"]
+    assert payload["shortlist_threshold"] == 60
+    assert payload["jd_versions"] == {"abc": "JD"}
+
+
+def test_rejects_foreign_and_newer_files(entries):
+    with pytest.raises(ValueError):
+        load_session(b"PK\x03\x04not a session")
+
+    blob = dump_session(entries, [])
+    newer = SESSION_MAGIC + bytes([SESSION_VERSION + 1]) + blob[5:]
+    with pytest.raises(ValueError):
+        load_session(newer)
+
+
+def test_content_hash_ignores_volatile_fields(entries):
+    a = dict(entries[0])
+    b = dict(entries[0], id="other", timestamp="2000-01-01 00:00:00", recruiter_notes="call back")
+    a.pop("content_hash", None)
+    b.pop("content_hash", None)
+    assert content_hash(a) == content_hash(b)
+
+
+def test_merge_skips_duplicates_and_fills_missing_notes(entries):
+    history = [dict(e) for e in entries[:3]]
+    incoming = load_session(dump_session([dict(e) for e in entries], []))["history"]
+    incoming[0]["recruiter_notes"] = "Strong on Spark"
+    history[1]["recruiter_notes"] = "Keep mine"
+    incoming[1]["recruiter_notes"] = "Theirs"
+
+    merged, added, updated = merge_history(history, incoming)
+
+    assert added == 2
+    assert updated == 1
+    assert len(merged) == 5
+    assert merged[0]["recruiter_notes"] == "Strong on Spark"
+    assert merged[1]["recruiter_notes"] == "Keep mine"
+
+
+def test_merge_renames_colliding_ids(entries):
+    history = [dict(entries[0])]
+    clash = dict(entries[1], id=entries[0]["id"])
+    clash.pop("content_hash", None)
+
+    merged, added, _ = merge_history(history, [clash])
+
+    assert added == 1
+    assert len({h["id"] for h in merged}) == 2
+    assert merged[1]["id"] == merged[1]["content_hash"][:12]
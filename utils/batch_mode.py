@@ -0,0 +1,355 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.cv_store import DEFAULT_CV_DIR, load_cv_text
+from utils.scoring import JSON_MODE_PARAMS, build_messages, normalize_result, now_ts, parse_json_content
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BATCH_DIR = ROOT / ".tma" / "batches"
+ENDPOINT = "/v1/chat/completions"
+FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+# Request files larger than this are spooled to disk instead of being held in memory.
+SPOOL_MAX_MEMORY = 8 << 20
+
+
+def build_batch_lines(
+    job_text: str,
+    model: str,
+    cvs: List[Dict[str, Any]],
+    cv_dir: str = DEFAULT_CV_DIR,
+) -> Iterator[Dict[str, Any]]:
+    # CVs are passed by hash and read back one at a time, so only one CV's text is in memory while writing.
+    for i, cv in enumerate(cvs):
+        cv_text = load_cv_text(cv["cv_hash"], cv_dir)
+        if cv_text is None:
+            raise ValueError(f"Stored text for {cv['cv_source']} is missing.")
+        yield {
+            "custom_id": f"cv-{i}",
+            "method": "POST",
+            "url": ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": build_messages(job_text, cv_text),
+                **JSON_MODE_PARAMS,
+            },
+        }
+
+
+def to_jsonl(lines: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode("utf-8")
+
+
+def spool_jsonl(lines: Iterator[Dict[str, Any]], max_memory: int = SPOOL_MAX_MEMORY):
+    # Each prompt is serialized and written as soon as it is built, so only one request is in memory at a time.
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory, mode="w+b")
+    for line in lines:
+        spool.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+    spool.seek(0)
+    return spool
+
+
+def manifest_path(batch_id: str, batch_dir: Path = DEFAULT_BATCH_DIR) -> Path:
+    return Path(batch_dir) / f"{batch_id}.json"
+
+
+def save_manifest(manifest: Dict[str, Any], batch_dir: Path = DEFAULT_BATCH_DIR):
+    path = manifest_path(manifest["batch_id"], batch_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def load_manifest(batch_id: str, batch_dir: Path = DEFAULT_BATCH_DIR) -> Dict[str, Any]:
+    return json.loads(manifest_path(batch_id, batch_dir).read_text(encoding="utf-8"))
+
+
+def list_batches(batch_dir: Path = DEFAULT_BATCH_DIR, limit: int = 10) -> List[Dict[str, Any]]:
+    out = []
+    for p in Path(batch_dir).glob("*.json"):
+        try:
+            m = json.loads(p.read_text(encoding="utf-8"))
+        except ValueError:
+            continue
+        out.append({
+            k: m.get(k)
+            for k in ("batch_id", "created_at", "status", "total", "completed", "failed", "output_file_id", "error_file_id")
+        })
+    out.sort(key=lambda m: m["created_at"] or "", reverse=True)
+    return out[:limit]
+
+
+def submit_batch(
+    batch_client: Any,
+    job_text: str,
+    model: str,
+    cvs: List[Dict[str, Any]],
+    errors: Optional[List[Dict[str, Any]]] = None,
+    batch_dir: Path = DEFAULT_BATCH_DIR,
+    cv_dir: str = DEFAULT_CV_DIR,
+) -> Dict[str, Any]:
+    with spool_jsonl(build_batch_lines(job_text, model, cvs, cv_dir)) as payload:
+        uploaded = batch_client.files.create(file=("talent_match_batch.jsonl", payload), purpose="batch")
+    batch = batch_client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=ENDPOINT,
+        completion_window="24h",
+        metadata={"app": "talent-match-assistant"},
+    )
+
+    # Everything needed to map responses back is kept on disk, so results can be collected after a restart.
+    manifest = {
+        "batch_id": batch.id,
+        "created_at": now_ts(),
+        "status": batch.status,
+        "model": model,
+        "job_text": job_text,
+        "input_file_id": uploaded.id,
+        "output_file_id": None,
+        "error_file_id": None,
+        "total": len(cvs),
+        "completed": 0,
+        "failed": 0,
+        "cvs": [{"cv_source": cv["cv_source"], "cv_hash": cv["cv_hash"]} for cv in cvs],
+        "extraction_errors": errors or [],
+    }
+    save_manifest(manifest, batch_dir)
+    return manifest
+
+
+def refresh_batch(batch_client: Any, manifest: Dict[str, Any], batch_dir: Path = DEFAULT_BATCH_DIR) -> Dict[str, Any]:
+    if manifest["status"] in FINAL_STATES:
+        return manifest
+
+    batch = batch_client.batches.retrieve(manifest["batch_id"])
+    counts = getattr(batch, "request_counts", None)
+    manifest["status"] = batch.status
+    manifest["output_file_id"] = getattr(batch, "output_file_id", None)
+    manifest["error_file_id"] = getattr(batch, "error_file_id", None)
+    if counts is not None:
+        manifest["completed"] = counts.completed
+        manifest["failed"] = counts.failed
+    if manifest["status"] in FINAL_STATES and manifest.get("input_file_id"):
+        # The request file holds every CV's text; once the batch is final nothing reads it again.
+        try:
+            batch_client.files.delete(manifest["input_file_id"])
+            manifest["input_file_id"] = None
+        except Exception:
+            pass
+    save_manifest(manifest, batch_dir)
+    return manifest
+
+
+def wait_for_batch(
+    batch_client: Any,
+    manifest: Dict[str, Any],
+    poll_every: float = 60.0,
+    timeout: float = 24 * 3600,
+    batch_dir: Path = DEFAULT_BATCH_DIR,
+) -> Dict[str, Any]:
+    deadline = time.time() + timeout
+    while True:
+        manifest = refresh_batch(batch_client, manifest, batch_dir)
+        if manifest["status"] in FINAL_STATES or time.time() >= deadline:
+            return manifest
+        time.sleep(poll_every)
+
+
+def purge_batches(batch_client: Any, max_age_days: float, batch_dir: Path = DEFAULT_BATCH_DIR) -> int:
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+    purged = 0
+    for p in Path(batch_dir).glob("*.json"):
+        try:
+            m = json.loads(p.read_text(encoding="utf-8"))
+        except ValueError:
+            continue
+        if m.get("status") not in FINAL_STATES or (m.get("created_at") or "") >= cutoff:
+            continue
+        for file_id in (m.get("input_file_id"), m.get("output_file_id"), m.get("error_file_id")):
+            if file_id:
+                try:
+                    batch_client.files.delete(file_id)
+                except Exception:
+                    # Already gone, or removed by the provider's own retention.
+                    pass
+        p.unlink(missing_ok=True)
+        purged += 1
+    return purged
+
+
+def collectable(manifest: Dict[str, Any]) -> bool:
+    # Expired and cancelled batches still carry the output of the requests that finished in time.
+    return manifest["status"] in FINAL_STATES and bool(manifest.get("output_file_id") or manifest.get("error_file_id"))
+
+
+def read_file_lines(batch_client: Any, file_id: Optional[str]) -> List[Dict[str, Any]]:
+    if not file_id:
+        return []
+    raw = batch_client.files.content(file_id).content
+    text = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def collect_batch(batch_client: Any, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    job_text = manifest["job_text"]
+    cvs = manifest["cvs"]
+    results: List[Dict[str, Any]] = list(manifest.get("extraction_errors") or [])
+    failures: List[Dict[str, Any]] = []
+    seen = set()
+
+    for line in read_file_lines(batch_client, manifest.get("output_file_id")) + read_file_lines(batch_client, manifest.get("error_file_id")):
+        idx = int(line["custom_id"].split("-", 1)[1])
+        seen.add(idx)
+        cv = cvs[idx]
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            failures.append({"cv_source": cv["cv_source"], "error": line.get("error") or response.get("body")})
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            data = parse_json_content(content)
+        except (KeyError, IndexError, ValueError) as e:
+            failures.append({"cv_source": cv["cv_source"], "error": str(e)})
+            continue
+        results.append(normalize_result(data, cv["cv_source"], job_text, cv_hash=cv["cv_hash"]))
+
+    for idx, cv in enumerate(cvs):
+        if idx not in seen:
+            failures.append({"cv_source": cv["cv_source"], "error": f"not processed before the batch was {manifest['status']}"})
+
+    return {"results": results, "failures": failures}
+
+
+class LocalBatchClient:
+    def __init__(self, root: str, responder: Any):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+        self.files = SimpleNamespace(create=self._file_create, content=self._file_content, delete=self._file_delete)
+        self.batches = SimpleNamespace(create=self._batch_create, retrieve=self._batch_retrieve)
+
+    def _file_create(self, file: Any, purpose: str):
+        src = file[1] if isinstance(file, tuple) else file
+        file_id = f"file-{uuid.uuid4().hex[:16]}"
+        path = self.root / file_id
+        if isinstance(src, (bytes, bytearray)):
+            path.write_bytes(src)
+        else:
+            with path.open("wb") as fh:
+                shutil.copyfileobj(src, fh)
+        return SimpleNamespace(id=file_id, purpose=purpose, bytes=path.stat().st_size)
+
+    def _file_content(self, file_id: str):
+        data = (self.root / file_id).read_bytes()
+        return SimpleNamespace(content=data, text=data.decode("utf-8"))
+
+    def _file_delete(self, file_id: str):
+        (self.root / file_id).unlink()
+        return SimpleNamespace(id=file_id, deleted=True)
+
+    def _state_path(self, batch_id: str) -> Path:
+        return self.root / f"{batch_id}.state.json"
+
+    def _batch_create(self, input_file_id: str, endpoint: str, completion_window: str, metadata: Dict[str, str] = None):
+        batch_id = f"batch_{uuid.uuid4().hex[:16]}"
+        state = {
+            "id": batch_id,
+            "status": "validating",
+            "input_file_id": input_file_id,
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        self._state_path(batch_id).write_text(json.dumps(state), encoding="utf-8")
+        return self._as_batch(state)
+
+    def _batch_retrieve(self, batch_id: str):
+        path = self._state_path(batch_id)
+        state = json.loads(path.read_text(encoding="utf-8"))
+        # The first poll reports in_progress, the next one runs the requests and completes.
+        if state["status"] == "validating":
+            state["status"] = "in_progress"
+        elif state["status"] == "in_progress":
+            self._run(state)
+        path.write_text(json.dumps(state), encoding="utf-8")
+        return self._as_batch(state)
+
+    def _run(self, state: Dict[str, Any]):
+        lines = [json.loads(x) for x in (self.root / state["input_file_id"]).read_text(encoding="utf-8").splitlines() if x.strip()]
+        out, errs = [], []
+        for line in lines:
+            body = line["body"]
+            try:
+                resp = self.responder.chat.completions.create(**body)
+                out.append({
+                    "custom_id": line["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": resp.choices[0].message.content}}]},
+                    },
+                    "error": None,
+                })
+            except Exception as e:
+                errs.append({"custom_id": line["custom_id"], "response": None, "error": {"message": str(e)}})
+
+        state["output_file_id"] = self._file_create(("output.jsonl", to_jsonl(out)), "batch_output").id
+        if errs:
+            state["error_file_id"] = self._file_create(("errors.jsonl", to_jsonl(errs)), "batch_output").id
+        state["request_counts"] = {"total": len(lines), "completed": len(out), "failed": len(errs)}
+        state["status"] = "completed"
+
+    def _as_batch(self, state: Dict[str, Any]):
+        return SimpleNamespace(
+            id=state["id"],
+            status=state["status"],
+            output_file_id=state["output_file_id"],
+            error_file_id=state["error_file_id"],
+            request_counts=SimpleNamespace(**state["request_counts"]),
+        )
+
+
+def make_batch_client(batch_dir: Path = DEFAULT_BATCH_DIR) -> Any:
+    from utils.openai_transport import build_openai_client
+    from utils.replay import ReplayClient
+
+    # Same choice as the app: replay mode and TMA_BATCH_LOCAL use the file-based stand-in.
+    replay = os.getenv("TMA_REPLAY_PATH")
+    if replay:
+        return LocalBatchClient(os.path.join(batch_dir, "local"), ReplayClient(replay))
+    client = build_openai_client(os.environ["OPENAI_API_KEY"])
+    if os.getenv("TMA_BATCH_LOCAL"):
+        return LocalBatchClient(os.path.join(batch_dir, "local"), client)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wait for Talent Match Assistant batch runs to finish")
+    parser.add_argument("batch_ids", nargs="*", help="batches to wait for (default: every unfinished batch)")
+    parser.add_argument("--dir", default=os.getenv("TMA_BATCH_DIR") or str(DEFAULT_BATCH_DIR))
+    parser.add_argument("--poll-every", type=float, default=60.0, help="seconds between status checks")
+    parser.add_argument("--timeout", type=float, default=24 * 3600, help="seconds to wait per batch")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    batch_client = make_batch_client(args.dir)
+    batch_ids = args.batch_ids or [b["batch_id"] for b in list_batches(args.dir, limit=1000) if b["status"] not in FINAL_STATES]
+    for batch_id in batch_ids:
+        manifest = wait_for_batch(batch_client, load_manifest(batch_id, args.dir), args.poll_every, args.timeout, args.dir)
+        ready = "results can be loaded in the app" if collectable(manifest) else "no results to load"
+        print(f"{batch_id}: {manifest['status']} • {manifest['completed']}/{manifest['total']} done • {manifest['failed']} failed • {ready}")
+
+
+if __name__ == "__main__":
+    main()
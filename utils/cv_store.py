@@ -0,0 +1,62 @@
+import os
+import time
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CV_DIR = os.getenv("TMA_CV_DIR", str(ROOT / ".tma" / "cv_text"))
+
+
+def cv_hash(cv_text: str) -> str:
+    return hashlib.sha256(cv_text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def cv_path(h: str, cv_dir: str = DEFAULT_CV_DIR) -> Path:
+    return Path(cv_dir) / h[:2] / f"{h}.txt"
+
+
+def store_cv_text(cv_text: str, cv_dir: str = DEFAULT_CV_DIR) -> str:
+    # Results only carry the hash; the text is read back when a CV has to be re-scored.
+    h = cv_hash(cv_text)
+    path = cv_path(h, cv_dir)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(cv_text, encoding="utf-8")
+        tmp.replace(path)
+    else:
+        # Storing the same CV again counts as a use, so the retention sweep keeps it.
+        os.utime(path)
+    return h
+
+
+def has_cv_text(h: Optional[str], cv_dir: str = DEFAULT_CV_DIR) -> bool:
+    return bool(h) and cv_path(h, cv_dir).exists()
+
+
+def load_cv_text(h: Optional[str], cv_dir: str = DEFAULT_CV_DIR) -> Optional[str]:
+    if not has_cv_text(h, cv_dir):
+        return None
+    return cv_path(h, cv_dir).read_text(encoding="utf-8")
+
+
+def delete_cv_text(hashes: Iterable[Optional[str]], cv_dir: str = DEFAULT_CV_DIR) -> int:
+    deleted = 0
+    for h in set(filter(None, hashes)):
+        path = cv_path(h, cv_dir)
+        if path.exists():
+            path.unlink()
+            deleted += 1
+    return deleted
+
+
+def sweep_cv_text(max_age_days: float, cv_dir: str = DEFAULT_CV_DIR) -> int:
+    cutoff = time.time() - max_age_days * 86400
+    deleted = 0
+    for path in Path(cv_dir).glob("*/*.txt"):
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            deleted += 1
+    return deleted
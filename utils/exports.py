@@ -0,0 +1,113 @@
+from io import BytesIO
+from typing import Any, Dict
+
+
+def build_full_text_with_notes(entry: Dict[str, Any]) -> str:
+    base = (entry.get("report_text") or "").strip()
+    notes = (entry.get("recruiter_notes") or "").strip()
+
+    if notes:
+        return f"{base}\n\n## Recruiter notes\n- {notes}\n"
+    return base
+
+
+def make_pdf_bytes(title: str, subtitle: str, body_text: str) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import cm
+
+    buff = BytesIO()
+    c = canvas.Canvas(buff, pagesize=A4)
+    width, height = A4
+
+    left = 2.0 * cm
+    top = height - 2.0 * cm
+    y = top
+
+    def draw_wrapped(text: str, font="Helvetica", size=10):
+        nonlocal y
+        c.setFont(font, size)
+        max_w = width - 2 * left
+
+        words = text.split()
+        line = ""
+        for w in words:
+            test = (line + " " + w).strip()
+            if c.stringWidth(test, font, size) <= max_w:
+                line = test
+            else:
+                c.drawString(left, y, line)
+                y -= 12
+                line = w
+                if y < 2 * cm:
+                    c.showPage()
+                    y = top
+                    c.setFont(font, size)
+
+        if line:
+            c.drawString(left, y, line)
+            y -= 12
+            if y < 2 * cm:
+                c.showPage()
+                y = top
+
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(left, y, title)
+    y -= 18
+
+    if subtitle:
+        c.setFont("Helvetica", 10)
+        c.drawString(left, y, subtitle[:120])
+        y -= 18
+
+    y -= 6
+    c.line(left, y, width - left, y)
+    y -= 18
+
+    for raw in body_text.replace("\r\n", "\n").splitlines():
+        line = raw.strip()
+        if not line:
+            y -= 8
+            if y < 2 * cm:
+                c.showPage()
+                y = top
+            continue
+
+        if line.startswith("## "):
+            y -= 6
+            draw_wrapped(line.replace("## ", ""), font="Helvetica-Bold", size=12)
+            y -= 2
+        else:
+            if line.startswith(("-", "*")):
+                line = "• " + line[1:].strip()
+            draw_wrapped(line, font="Helvetica", size=10)
+
+    c.save()
+    buff.seek(0)
+    return buff.read()
+
+
+def make_docx_bytes(title: str, subtitle: str, body_text: str) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading(title, level=1)
+    if subtitle:
+        doc.add_paragraph(subtitle)
+
+    for raw in body_text.replace("\r\n", "\n").splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("## "):
+            doc.add_heading(line.replace("## ", ""), level=2)
+        elif line.startswith(("-", "*")):
+            doc.add_paragraph(line[1:].strip(), style="List Bullet")
+        else:
+            doc.add_paragraph(line)
+
+    bio = BytesIO()
+    doc.save(bio)
+    bio.seek(0)
+    return bio.read()
+
@@ -0,0 +1,184 @@
+import re
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
+
+from utils.scoring import safe_int
+
+
+# Old and new lines sharing at least this share of their terms are paired up as the same requirement.
+# Pairing only decides what to compare; whether a pair changed depends on its requirement-bearing terms.
+PAIR_THRESHOLD = 0.5
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from has have in is it its of on or our the their this to we will with you your
+    able must should strong good solid excellent proven plus nice ideally preferably including e.g etc
+    """.split()
+)
+
+# Skills, tools and qualifications a candidate is scored against. Other words in a requirement are wording.
+REQUIREMENT_VOCAB = frozenset(
+    """
+    python java javascript typescript go golang rust scala kotlin swift php ruby c c++ c# .net r matlab sql nosql
+    postgres postgresql mysql oracle mongodb redis elasticsearch kafka rabbitmq spark hadoop hive flink airflow dbt
+    snowflake bigquery redshift databricks looker tableau power bi excel aws gcp azure docker kubernetes terraform
+    ansible linux git github gitlab jenkins jira confluence salesforce sap workday hubspot react angular vue node
+    django flask fastapi spring pandas numpy pytorch tensorflow ml ai llm nlp etl api rest graphql microservices
+    ci cd devops mlops scrum agile kanban figma photoshop seo crm erp gdpr sox ifrs gaap cpa cfa pmp itil
+    bachelor master masters msc bsc mba phd degree certification certified license
+    english german french spanish italian dutch portuguese polish chinese mandarin japanese arabic
+    remote onsite hybrid relocation travel visa clearance
+    """.split()
+)
+
+SUBSCORE_PATTERNS = {
+    "experience": re.compile(r"\b(\d+\+?\s*(years?|yrs)|experience[d]?|senior|junior|lead|principal|seniority|track record)\b", re.I),
+    "tools": re.compile(r"\b(tools?|platforms?|software|stack|frameworks?|librar(y|ies)|cloud|aws|gcp|azure|sql|excel|jira|git|docker|kubernetes|terraform|spark|airflow|dbt|tableau|power ?bi|salesforce|sap|workday)\b", re.I),
+    "domain": re.compile(r"\b(industry|domain|sector|market|finance|financial|banking|fintech|healthcare|pharma|retail|e-?commerce|insurance|saas|b2b|b2c|telecom|energy|public sector|logistics)\b", re.I),
+}
+
+
+def split_requirements(job_text: str) -> List[str]:
+    reqs = []
+    for raw in (job_text or "").replace("\r\n", "\n").splitlines():
+        line = raw.strip().lstrip("-*•·").strip()
+        if not line or line.endswith(":"):
+            continue
+        for part in re.split(r"(?<=[.;])\s+", line):
+            part = part.strip()
+            if part:
+                reqs.append(part)
+    return reqs
+
+
+def stem(token: str) -> str:
+    # "5+" and "5" are the same requirement; "at least" around it is wording.
+    if any(ch.isdigit() for ch in token):
+        return token.rstrip("+")
+    # Just enough to treat plural and tense changes ("tools", "experienced") as cosmetic.
+    for suffix in ("ing", "ed", "es", "s", "e"):
+        if token.isalpha() and len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+VOCAB_STEMS = frozenset(stem(w) for w in REQUIREMENT_VOCAB)
+
+
+def tokens(requirement: str) -> List[Tuple[str, str, int]]:
+    out = []
+    for pos, m in enumerate(re.finditer(r"[A-Za-z0-9.#+][A-Za-z0-9+#.]*", requirement)):
+        raw = m.group(0).strip(".")
+        if raw and raw.lower() not in STOPWORDS:
+            out.append((raw, raw.lower(), pos))
+    return out
+
+
+def is_requirement_term(raw: str, token: str, pos: int) -> bool:
+    if stem(token) in VOCAB_STEMS or any(ch.isdigit() for ch in token):
+        return True
+    if any(ch in token for ch in "+#.") or SUBSCORE_PATTERNS["domain"].fullmatch(token):
+        return True
+    # Acronyms anywhere, and capitalised names (tools, languages, certifications) past the first word.
+    return (len(raw) > 1 and raw.isupper()) or (pos > 0 and raw[:1].isupper())
+
+
+def term_words(requirement: str) -> Dict[str, str]:
+    words = {}
+    for _, token, _ in tokens(requirement):
+        words.setdefault(stem(token), token)
+    return words
+
+
+def requirement_terms(requirement: str) -> FrozenSet[str]:
+    return frozenset(term_words(requirement))
+
+
+def key_terms(requirement: str) -> Set[str]:
+    return {stem(token) for raw, token, pos in tokens(requirement) if is_requirement_term(raw, token, pos)}
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def pair_requirements(old_reqs: List[str], new_reqs: List[str]) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+    old_terms = [requirement_terms(r) for r in old_reqs]
+    new_terms = [requirement_terms(r) for r in new_reqs]
+    candidates = sorted(
+        (
+            (similarity(nt, ot), -abs(i - j), j, i)
+            for j, nt in enumerate(new_terms) if nt
+            for i, ot in enumerate(old_terms) if ot
+        ),
+        reverse=True,
+    )
+
+    # Greedy best-first, so an unchanged line always keeps its exact counterpart.
+    pairs, used_old, used_new = [], set(), set()
+    for sim, _, j, i in candidates:
+        if sim < PAIR_THRESHOLD:
+            break
+        if i in used_old or j in used_new:
+            continue
+        pairs.append((i, j))
+        used_old.add(i)
+        used_new.add(j)
+
+    # A sentence reworded past the similarity cutoff still pairs with a leftover line asking for the same
+    # things, or, when neither names anything to score against, with the next leftover wording-only line.
+    old_keys = {i: frozenset(key_terms(old_reqs[i])) for i, t in enumerate(old_terms) if t and i not in used_old}
+    new_keys = {j: frozenset(key_terms(new_reqs[j])) for j, t in enumerate(new_terms) if t and j not in used_new}
+    for j, nk in sorted(new_keys.items()):
+        i = next((i for i, ok in sorted(old_keys.items()) if ok == nk), None)
+        if i is not None:
+            pairs.append((i, j))
+            del old_keys[i]
+            used_old.add(i)
+            used_new.add(j)
+
+    added = [j for j, t in enumerate(new_terms) if t and j not in used_new]
+    removed = [i for i, t in enumerate(old_terms) if t and i not in used_old]
+    return sorted(pairs, key=lambda p: p[1]), added, removed
+
+
+def affected_subscores(requirements: List[str]) -> List[str]:
+    hit = []
+    for req in requirements:
+        matched = [k for k, pat in SUBSCORE_PATTERNS.items() if pat.search(req)]
+        hit.extend(matched or ["skills"])
+    return [k for k in ("skills", "experience", "tools", "domain") if k in hit]
+
+
+def diff_requirements(old_text: str, new_text: str) -> Dict[str, Any]:
+    old_reqs = split_requirements(old_text)
+    new_reqs = split_requirements(new_text)
+    pairs, added_idx, removed_idx = pair_requirements(old_reqs, new_reqs)
+
+    changed = []
+    for i, j in pairs:
+        old_words = term_words(old_reqs[i])
+        new_words = term_words(new_reqs[j])
+        old_keys = key_terms(old_reqs[i])
+        new_keys = key_terms(new_reqs[j])
+        # Only skills, tools, numbers and qualifications count; other word churn in a paired line is rewording.
+        plus = [w for k, w in new_words.items() if k in new_keys and k not in old_words]
+        minus = [w for k, w in old_words.items() if k in old_keys and k not in new_words]
+        if plus or minus:
+            changed.append({"old": old_reqs[i], "new": new_reqs[j], "added_terms": plus, "removed_terms": minus})
+
+    added = [new_reqs[j] for j in added_idx]
+    removed = [old_reqs[i] for i in removed_idx]
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "cosmetic": not added and not removed and not changed,
+        "subscores": affected_subscores(added + removed + [c["new"] for c in changed]),
+    }
+
+
+def boundary_order(results: List[Dict[str, Any]], threshold: int) -> List[Dict[str, Any]]:
+    # Candidates closest to the shortlist cut-off are the ones a requirement change is most likely to move across it.
+    return sorted(results, key=lambda r: abs(safe_int(r.get("overall_score")) - threshold))
@@ -0,0 +1,434 @@
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.cv_store import DEFAULT_CV_DIR, store_cv_text
+from utils.scoring import call_openai_json, extraction_error_entry, normalize_result, now_ts
+
+
+ROOT = Path(__file__).resolve().parent.parent
+# One queue per app install: every browser session sees the same jobs. Use a separate DB per user when hosting.
+DEFAULT_DB = os.getenv("TMA_JOBS_DB", str(ROOT / ".tma" / "jobs.sqlite3"))
+
+COPY_CHUNK = 1 << 20
+HEARTBEAT_EVERY = 5.0
+# A running job whose worker has not sent a heartbeat for this long is considered orphaned.
+STALE_AFTER = 60.0
+WORKER_IDLE_EXIT = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    model TEXT NOT NULL,
+    job_text TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    heartbeat REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload BLOB,
+    status TEXT NOT NULL DEFAULT 'pending',
+    result TEXT,
+    error TEXT,
+    finished_at TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE TABLE IF NOT EXISTS workers (
+    pid INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_items_status ON job_items (job_id, status, idx);
+"""
+
+
+def connect(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def submit_job(job_text: str, model: str, items: Iterable[Dict[str, Any]], db_path: str = DEFAULT_DB) -> str:
+    job_id = uuid.uuid4().hex[:12]
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO jobs (id, created_at, status, model, job_text, total) VALUES (?, ?, 'queued', ?, ?, ?)",
+            (job_id, now_ts(), model, job_text, 0),
+        )
+        total = 0
+        for i, it in enumerate(items):
+            insert_item(conn, job_id, i, it)
+            total += 1
+        conn.execute("UPDATE jobs SET total = ? WHERE id = ?", (total, job_id))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return job_id
+
+
+def insert_item(conn: sqlite3.Connection, job_id: str, idx: int, item: Dict[str, Any]):
+    src = item.get("file")
+    if src is None or not hasattr(conn, "blobopen"):
+        if src is not None:
+            src.seek(0)
+        payload = item["payload"] if src is None else src.read()
+        conn.execute(
+            "INSERT INTO job_items (job_id, idx, name, kind, payload) VALUES (?, ?, ?, ?, ?)",
+            (job_id, idx, item["name"], item["kind"], payload),
+        )
+        return
+
+    # Stream the upload into a pre-sized blob so the full file is never copied in one piece.
+    cur = conn.execute(
+        "INSERT INTO job_items (job_id, idx, name, kind, payload) VALUES (?, ?, ?, ?, zeroblob(?))",
+        (job_id, idx, item["name"], item["kind"], item["size"]),
+    )
+    src.seek(0)
+    with conn.blobopen("job_items", "payload", cur.lastrowid) as blob:
+        while True:
+            chunk = src.read(COPY_CHUNK)
+            if not chunk:
+                break
+            blob.write(chunk)
+
+
+def job_status(job_id: str, db_path: str = DEFAULT_DB) -> Optional[Dict[str, Any]]:
+    conn = connect(db_path)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def list_jobs(limit: int = 10, db_path: str = DEFAULT_DB) -> List[Dict[str, Any]]:
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT id, created_at, status, total, completed, failed, error FROM jobs ORDER BY created_at DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def job_results(job_id: str, db_path: str = DEFAULT_DB) -> List[Dict[str, Any]]:
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT result FROM job_items WHERE job_id = ? AND status = 'done' ORDER BY idx",
+            (job_id,),
+        ).fetchall()
+        return [json.loads(r["result"]) for r in rows]
+    finally:
+        conn.close()
+
+
+def job_summaries(job_id: str, db_path: str = DEFAULT_DB) -> List[Dict[str, Any]]:
+    # Only the columns the progress view shows; full results are parsed once the job is loaded.
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT json_extract(result, '$.overall_score') AS overall_score,
+                   json_extract(result, '$.recommendation') AS recommendation,
+                   json_extract(result, '$.cv_source') AS cv_source
+            FROM job_items WHERE job_id = ? AND status = 'done'
+            ORDER BY overall_score DESC, idx
+            """,
+            (job_id,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def job_failures(job_id: str, db_path: str = DEFAULT_DB) -> List[Dict[str, Any]]:
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT idx, name, error FROM job_items WHERE job_id = ? AND status = 'failed' ORDER BY idx",
+            (job_id,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def cancel_job(job_id: str, db_path: str = DEFAULT_DB):
+    conn = connect(db_path)
+    try:
+        conn.execute("UPDATE jobs SET status = 'cancelled' WHERE id = ? AND status IN ('queued', 'running')", (job_id,))
+    finally:
+        conn.close()
+
+
+def retry_failed(job_id: str, db_path: str = DEFAULT_DB):
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        n = conn.execute(
+            "UPDATE job_items SET status = 'pending', error = NULL WHERE job_id = ? AND status = 'failed' AND payload IS NOT NULL",
+            (job_id,),
+        ).rowcount
+        if n:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', failed = failed - ?, error = NULL WHERE id = ?",
+                (n, job_id),
+            )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def purge_jobs(max_age_days: float, db_path: str = DEFAULT_DB) -> int:
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        old = "SELECT id FROM jobs WHERE created_at < ? AND status NOT IN ('queued', 'running')"
+        conn.execute(f"DELETE FROM job_items WHERE job_id IN ({old})", (cutoff,))
+        n = conn.execute(f"DELETE FROM jobs WHERE id IN ({old})", (cutoff,)).rowcount
+        conn.execute("COMMIT")
+        if n:
+            # Give the space held by the deleted results and unscored uploads back to the disk.
+            conn.execute("VACUUM")
+        return n
+    finally:
+        conn.close()
+
+
+def ensure_workers(db_path: str = DEFAULT_DB, count: int = 1) -> int:
+    conn = connect(db_path)
+    try:
+        # Counting and spawning under one write lock, so concurrent callers cannot both start the missing worker.
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM workers WHERE heartbeat < ?", (time.time() - STALE_AFTER,))
+        live = conn.execute("SELECT COUNT(*) FROM workers").fetchone()[0]
+        spawned = 0
+        for _ in range(max(0, count - live)):
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "utils.job_queue", "--db", db_path],
+                cwd=str(ROOT),
+                env=dict(os.environ),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            # Registered at spawn time: the worker takes a while to import openai before it records itself.
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (pid, started_at, heartbeat) VALUES (?, ?, ?)",
+                (proc.pid, now_ts(), time.time()),
+            )
+            spawned += 1
+        conn.execute("COMMIT")
+        return spawned
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def claim_job(conn: sqlite3.Connection, pid: int) -> Optional[sqlite3.Row]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Queued jobs first, then running jobs whose worker stopped sending heartbeats.
+        row = conn.execute(
+            """
+            SELECT * FROM jobs
+            WHERE status = 'queued' OR (status = 'running' AND (heartbeat IS NULL OR heartbeat < ?))
+            ORDER BY created_at
+            LIMIT 1
+            """,
+            (time.time() - STALE_AFTER,),
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker_pid = ?, heartbeat = ? WHERE id = ?",
+                (pid, time.time(), row["id"]),
+            )
+        conn.execute("COMMIT")
+        return row
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def make_client():
+    from utils.replay import RecordingClient, ReplayClient
+
+    replay = os.getenv("TMA_REPLAY_PATH")
+    if replay:
+        return ReplayClient(replay)
+
+    from utils.openai_transport import build_openai_client
+
+    client = build_openai_client(os.environ["OPENAI_API_KEY"])
+    record = os.getenv("TMA_RECORD_PATH")
+    return RecordingClient(client, record) if record else client
+
+
+def score_item(
+    client: Any,
+    model: str,
+    job_text: str,
+    name: str,
+    kind: str,
+    payload: bytes,
+    cv_dir: str = DEFAULT_CV_DIR,
+) -> Dict[str, Any]:
+    if kind == "text":
+        cv_text = payload.decode("utf-8")
+        data = call_openai_json(client, model, job_text, cv_text)
+        return normalize_result(data, "Pasted text", job_text, id_source="pasted_text", cv_hash=store_cv_text(cv_text, cv_dir))
+
+    from utils.cv_extract import extract_cv_text
+
+    try:
+        cv_text, detected = extract_cv_text(name, payload)
+        cv_source = f"{name} ({detected.upper()})"
+    except Exception as e:
+        return extraction_error_entry(name, job_text, e)
+
+    data = call_openai_json(client, model, job_text, cv_text)
+    return normalize_result(data, cv_source, job_text, cv_hash=store_cv_text(cv_text, cv_dir))
+
+
+def run_job(conn: sqlite3.Connection, client: Any, job: sqlite3.Row, cv_dir: str = DEFAULT_CV_DIR):
+    job_id = job["id"]
+    while True:
+        state = conn.execute("SELECT status, worker_pid FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        # Stop if the job was cancelled or reclaimed by another worker after a missed heartbeat.
+        if state["status"] != "running" or state["worker_pid"] != os.getpid():
+            return
+
+        # Items are committed one at a time, so a restarted job picks up after the last finished CV.
+        item = conn.execute(
+            "SELECT rowid, idx, name, kind FROM job_items WHERE job_id = ? AND status = 'pending' ORDER BY idx LIMIT 1",
+            (job_id,),
+        ).fetchone()
+        if item is None:
+            break
+
+        try:
+            payload = conn.execute("SELECT payload FROM job_items WHERE rowid = ?", (item["rowid"],)).fetchone()[0]
+            entry = score_item(client, job["model"], job["job_text"], item["name"], item["kind"], payload, cv_dir)
+        except Exception as e:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE job_items SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ? AND idx = ?",
+                (str(e), now_ts(), job_id, item["idx"]),
+            )
+            conn.execute("UPDATE jobs SET failed = failed + 1 WHERE id = ?", (job_id,))
+            conn.execute("COMMIT")
+            continue
+        finally:
+            # Only one CV's raw bytes are alive at a time.
+            payload = None
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE job_items SET status = 'done', result = ?, payload = NULL, finished_at = ? WHERE job_id = ? AND idx = ?",
+            (json.dumps(entry, ensure_ascii=False), now_ts(), job_id, item["idx"]),
+        )
+        conn.execute("UPDATE jobs SET completed = completed + 1, heartbeat = ? WHERE id = ?", (time.time(), job_id))
+        conn.execute("COMMIT")
+
+    conn.execute("UPDATE jobs SET status = 'done' WHERE id = ? AND status = 'running'", (job_id,))
+
+
+def run_worker(
+    db_path: str = DEFAULT_DB,
+    idle_exit: float = WORKER_IDLE_EXIT,
+    poll: float = 1.0,
+    cv_dir: str = DEFAULT_CV_DIR,
+):
+    pid = os.getpid()
+    conn = connect(db_path)
+    conn.execute(
+        "INSERT OR REPLACE INTO workers (pid, started_at, heartbeat) VALUES (?, ?, ?)",
+        (pid, now_ts(), time.time()),
+    )
+
+    current = {"job_id": None}
+    stop = threading.Event()
+
+    def heartbeat():
+        hb = connect(db_path)
+        while not stop.wait(HEARTBEAT_EVERY):
+            now = time.time()
+            hb.execute("UPDATE workers SET heartbeat = ? WHERE pid = ?", (now, pid))
+            if current["job_id"]:
+                hb.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker_pid = ?", (now, current["job_id"], pid))
+        hb.close()
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    client = None
+    idle_since = time.time()
+    try:
+        while True:
+            job = claim_job(conn, pid)
+            if job is None:
+                if time.time() - idle_since > idle_exit:
+                    break
+                time.sleep(poll)
+                continue
+
+            current["job_id"] = job["id"]
+            try:
+                if client is None:
+                    client = make_client()
+                run_job(conn, client, job, cv_dir)
+            except Exception as e:
+                conn.execute("UPDATE jobs SET status = 'failed', error = ? WHERE id = ?", (str(e), job["id"]))
+            current["job_id"] = None
+            idle_since = time.time()
+    finally:
+        stop.set()
+        conn.execute("DELETE FROM workers WHERE pid = ?", (pid,))
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Talent Match Assistant background scoring worker")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--idle-exit", type=float, default=WORKER_IDLE_EXIT, help="seconds without jobs before exiting")
+    parser.add_argument("--cv-dir", default=DEFAULT_CV_DIR, help="where extracted CV text is kept for re-scoring")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    run_worker(args.db, idle_exit=args.idle_exit, cv_dir=args.cv_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import os
+import time
+import threading
+import importlib.util
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import OpenAI
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def transport_settings_from_env() -> Dict[str, Any]:
+    return {
+        "base_url": os.getenv("OPENAI_BASE_URL") or None,
+        # Each process (the app, every job worker) scores one CV at a time, so one connection plus a spare for retries.
+        # Raise it when several browser sessions score at once through the same app process.
+        "max_connections": max(1, env_int("OPENAI_MAX_CONNECTIONS", 2)),
+        "keepalive_connections": max(1, env_int("OPENAI_KEEPALIVE_CONNECTIONS", 2)),
+        "keepalive_expiry": env_float("OPENAI_KEEPALIVE_EXPIRY", 60.0),
+        "connect_timeout": env_float("OPENAI_CONNECT_TIMEOUT", 5.0),
+        "read_timeout": env_float("OPENAI_READ_TIMEOUT", 120.0),
+        "write_timeout": env_float("OPENAI_WRITE_TIMEOUT", 30.0),
+        "pool_timeout": env_float("OPENAI_POOL_TIMEOUT", 30.0),
+        "http2": env_flag("OPENAI_HTTP2", True) and http2_available(),
+        "max_retries": max(0, env_int("OPENAI_MAX_RETRIES", 2)),
+    }
+
+
+class ConnectionStats:
+    def __init__(self, keep_last: int = 200):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=keep_last)
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+
+    def tracer(self, record: Dict[str, Any]):
+        def trace(event_name: str, info: Dict[str, Any]):
+            # httpcore only emits connect_tcp/start_tls when it has to open a new connection.
+            if event_name.startswith("connection.connect_tcp.started"):
+                record["reused"] = False
+            elif event_name.startswith("connection.start_tls.complete"):
+                record["tls_handshake"] = True
+        return trace
+
+    def on_request(self, request: httpx.Request):
+        record = {
+            "method": request.method,
+            "path": request.url.path,
+            "started": time.perf_counter(),
+            "reused": True,
+            "tls_handshake": False,
+        }
+        request.extensions["trace"] = self.tracer(record)
+        request.extensions["tma_record"] = record
+
+    def on_response(self, response: httpx.Response):
+        record = response.request.extensions.get("tma_record")
+        if record is None:
+            return
+        record["status"] = response.status_code
+        record["http_version"] = response.http_version
+        record["elapsed_ms"] = round((time.perf_counter() - record.pop("started")) * 1000, 1)
+        with self._lock:
+            self.requests += 1
+            if record["reused"]:
+                self.reused_connections += 1
+            else:
+                self.new_connections += 1
+            self._recent.append(record)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.requests
+            return {
+                "requests": total,
+                "new_connections": self.new_connections,
+                "reused_connections": self.reused_connections,
+                "reuse_ratio": round(self.reused_connections / total, 3) if total else 0.0,
+                "recent": list(self._recent),
+            }
+
+
+def build_http_client(settings: Dict[str, Any], stats: Optional[ConnectionStats] = None) -> httpx.Client:
+    hooks = {}
+    if stats is not None:
+        hooks = {"request": [stats.on_request], "response": [stats.on_response]}
+
+    return httpx.Client(
+        http2=settings["http2"],
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(
+            connect=settings["connect_timeout"],
+            read=settings["read_timeout"],
+            write=settings["write_timeout"],
+            pool=settings["pool_timeout"],
+        ),
+        event_hooks=hooks,
+    )
+
+
+def build_openai_client(
+    api_key: str,
+    settings: Optional[Dict[str, Any]] = None,
+    stats: Optional[ConnectionStats] = None,
+) -> OpenAI:
+    settings = settings or transport_settings_from_env()
+    http_client = build_http_client(settings, stats)
+    kwargs = {
+        "api_key": api_key,
+        "http_client": http_client,
+        "max_retries": settings["max_retries"],
+        "timeout": http_client.timeout,
+    }
+    if settings.get("base_url"):
+        kwargs["base_url"] = settings["base_url"]
+    return OpenAI(**kwargs)
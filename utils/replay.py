@@ -0,0 +1,100 @@
+import json
+import hashlib
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# Request options that change the answer; the JSON-mode call and its plain fallback must not share a recording.
+KEY_PARAMS = ("temperature", "response_format")
+
+
+def request_params(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in kwargs.items() if k in KEY_PARAMS}
+
+
+def request_key(model: str, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> str:
+    raw = json.dumps(
+        {"model": model, "messages": messages, "params": request_params(params or {})},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def fake_completion(content: str, model: str = "") -> SimpleNamespace:
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+    )
+
+
+def load_cassette(path: str) -> Dict[str, Dict[str, Any]]:
+    records = {}
+    p = Path(path)
+    if not p.exists():
+        return records
+    with p.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                rec = json.loads(line)
+                # Recordings made before params were part of the key are re-keyed from what they stored.
+                if "messages" in rec:
+                    rec["key"] = request_key(rec["model"], rec["messages"], rec.get("params"))
+                records[rec["key"]] = rec
+    return records
+
+
+class _Completions:
+    def __init__(self, create):
+        self.create = create
+
+
+class RecordingClient:
+    def __init__(self, inner: Any, path: str):
+        self.inner = inner
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        resp = self.inner.chat.completions.create(model=model, messages=messages, **kwargs)
+        record = {
+            "key": request_key(model, messages, kwargs),
+            "model": model,
+            "messages": messages,
+            "params": request_params(kwargs),
+            "content": resp.choices[0].message.content,
+        }
+        with self._lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return resp
+
+
+class ReplayClient:
+    def __init__(self, path: Optional[str] = None, records: Optional[Iterable[Dict[str, Any]]] = None, strict: bool = True):
+        self.records = load_cassette(path) if path else {}
+        for rec in records or []:
+            self.records[rec["key"]] = rec
+        self.strict = strict
+        self.calls = 0
+        self.misses = 0
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def add(self, model: str, messages: List[Dict[str, str]], content: str, **params):
+        key = request_key(model, messages, params)
+        self.records[key] = {"key": key, "model": model, "messages": messages, "params": request_params(params), "content": content}
+
+    def _create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        self.calls += 1
+        rec = self.records.get(request_key(model, messages, kwargs))
+        if rec is None:
+            self.misses += 1
+            if self.strict:
+                raise KeyError("No recorded response for this prompt.")
+            return fake_completion("{}", model)
+        return fake_completion(rec["content"], model)
@@ -0,0 +1,68 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+SUBSCORE_KEYS = ("skills", "experience", "tools", "domain")
+SORT_KEYS = ["overall_score", "skills", "experience"]
+TABLE_COLUMNS = [
+    "id", "timestamp", "cv_source", "jd_hash", "overall_score", "recommendation",
+    *SUBSCORE_KEYS, "missing_count", "missing_keywords",
+]
+
+
+def as_int_array(values: List[Any]) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce").fillna(0).astype("int64").to_numpy()
+
+
+def results_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    if not results:
+        return pd.DataFrame({c: pd.Series(dtype="object") for c in TABLE_COLUMNS})
+
+    subs = [r.get("subscores") or {} for r in results]
+    missing = [r.get("missing_keywords") or [] for r in results]
+    cols = {
+        "id": [r["id"] for r in results],
+        "timestamp": [r.get("timestamp", "") for r in results],
+        "cv_source": [r.get("cv_source", "") for r in results],
+        "jd_hash": [r.get("jd_hash") or "" for r in results],
+        "overall_score": as_int_array([r.get("overall_score") for r in results]),
+        "recommendation": pd.Categorical([r.get("recommendation", "") for r in results]),
+    }
+    for k in SUBSCORE_KEYS:
+        cols[k] = as_int_array([s.get(k) for s in subs])
+    cols["missing_count"] = np.fromiter((len(m) for m in missing), dtype="int64", count=len(missing))
+    cols["missing_keywords"] = missing
+    return pd.DataFrame(cols)
+
+
+def ranked(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(SORT_KEYS, ascending=False, kind="stable")
+
+
+def shortlist(df: pd.DataFrame, threshold: int) -> pd.DataFrame:
+    return ranked(df[df["overall_score"].to_numpy() >= threshold])
+
+
+def missing_keyword_counts(df: pd.DataFrame, top: int = 15) -> pd.DataFrame:
+    kw = df["missing_keywords"].explode().dropna().astype(str).str.strip()
+    kw = kw[kw != ""]
+    if kw.empty:
+        return pd.DataFrame({"keyword": pd.Series(dtype="object"), "candidates": pd.Series(dtype="int64")})
+
+    # Case-insensitive, and each keyword counts at most once per candidate.
+    flat = pd.DataFrame({"row": kw.index, "keyword": kw.to_numpy(), "key": kw.str.lower().to_numpy()})
+    flat = flat.drop_duplicates(["row", "key"])
+    counts = flat.groupby("key", sort=False).agg(keyword=("keyword", "first"), candidates=("row", "size"))
+    return counts.nlargest(top, "candidates", keep="first").reset_index(drop=True)
+
+
+def score_distribution(df: pd.DataFrame, width: int = 10) -> pd.DataFrame:
+    edges = np.arange(0, 100 + width, width)
+    labels = [f"{lo}–{min(lo + width - 1, 100)}" for lo in edges[:-1]]
+    labels[-1] = f"{edges[-2]}–100"
+    scores = np.clip(df["overall_score"].to_numpy(), 0, 100)
+    idx = np.minimum(scores // width, len(labels) - 1)
+    counts = np.bincount(idx.astype("int64"), minlength=len(labels))
+    return pd.DataFrame({"score": labels, "candidates": counts})
@@ -0,0 +1,239 @@
+import re
+import json
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List
+
+from openai import OpenAI
+
+
+# Every scoring request asks for a JSON object; the batch request file sends the same options.
+JSON_MODE_PARAMS = {"temperature": 0.2, "response_format": {"type": "json_object"}}
+
+
+def now_ts() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def stable_id(*parts: str) -> str:
+    raw = "||".join([p or "" for p in parts]).encode("utf-8", errors="ignore")
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def jd_hash(job_text: str) -> str:
+    return hashlib.sha1((job_text or "").strip().encode("utf-8", errors="ignore")).hexdigest()[:12]
+
+
+def safe_int(x: Any, default: int = 0) -> int:
+    try:
+        return int(x)
+    except Exception:
+        return default
+
+
+def json_to_markdown_report(cv_source: str, data: Dict[str, Any]) -> str:
+    score = data.get("overall_score", "N/A")
+    reco = data.get("recommendation", "N/A")
+    subs = data.get("subscores", {}) or {}
+    expl = data.get("explainable_score", {}) or {}
+    interview = data.get("interview_guide", {}) or {}
+
+    def bullets(arr):
+        arr = arr or []
+        return "\n".join([f"- {x}" for x in arr if x]) or "—"
+
+    report = f"""## Candidate
+- Source: {cv_source}
+
+## Overall match score
+{score}
+
+## Recommendation
+{reco}
+
+## Explainable score
+**Subscores**
+- Skills: {subs.get("skills", 0)}
+- Experience: {subs.get("experience", 0)}
+- Tools: {subs.get("tools", 0)}
+- Domain: {subs.get("domain", 0)}
+
+**Why this score**
+{bullets(expl.get("why_this_score", []))}
+
+**Top evidence**
+{bullets(expl.get("top_evidence", []))}
+
+## Executive summary
+{data.get("summary","") or "—"}
+
+## Key strengths
+{bullets(data.get("strengths", []))}
+
+## Gaps & risks
+{bullets(data.get("gaps_risks", []))}
+
+## Missing keywords / requirements
+{bullets(data.get("missing_keywords", []))}
+
+## Interview guide (focused on gaps)
+**Critical**
+{bullets(interview.get("critical", []))}
+
+**Nice-to-have**
+{bullets(interview.get("nice_to_have", []))}
+
+## CV improvement suggestions
+{bullets(data.get("cv_improvements", []))}
+"""
+    return report.strip()
+
+
+def build_schema_instruction() -> str:
+    return """
+Return ONLY a valid JSON object with EXACTLY these keys:
+{
+  "overall_score": <integer 0-100>,
+  "recommendation": <one of "Strong Yes","Yes","Maybe","No">,
+  "subscores": {
+    "skills": <0-100>,
+    "experience": <0-100>,
+    "tools": <0-100>,
+    "domain": <0-100>
+  },
+  "explainable_score": {
+    "why_this_score": [<bullet strings>],
+    "top_evidence": [<short evidence strings referencing CV facts>]
+  },
+  "strengths": [<bullet strings>],
+  "gaps_risks": [<bullet strings>],
+  "missing_keywords": [<strings>],
+  "interview_guide": {
+    "critical": [<questions/checks>],
+    "nice_to_have": [<questions/checks>]
+  },
+  "cv_improvements": [<bullet strings>],
+  "summary": <1-2 sentence executive summary>
+}
+
+Rules:
+- Do NOT invent. Only claim what is explicitly in the CV.
+- Keep bullets short and business-ready.
+""".strip()
+
+
+SYSTEM_PROMPT = "Be rigorous, factual, and concise. Output JSON only."
+
+
+def build_prompt(job_text: str, cv_text: str) -> str:
+    return f"""
+You are a senior HR Talent Intelligence analyst.
+
+Task: Assess CV vs Job Description with a factual, explainable evaluation.
+{build_schema_instruction()}
+
+JOB DESCRIPTION:
+{job_text}
+
+CANDIDATE CV:
+{cv_text}
+""".strip()
+
+
+def build_messages(job_text: str, cv_text: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(job_text, cv_text)},
+    ]
+
+
+def parse_json_content(content: str) -> Dict[str, Any]:
+    content = content or ""
+    try:
+        return json.loads(content)
+    except ValueError:
+        m = re.search(r"\{.*\}", content, flags=re.DOTALL)
+        if not m:
+            raise ValueError("Model did not return JSON.")
+        return json.loads(m.group(0))
+
+
+def call_openai_json(client: OpenAI, model: str, job_text: str, cv_text: str) -> Dict[str, Any]:
+    messages = build_messages(job_text, cv_text)
+
+    try:
+        resp = client.chat.completions.create(model=model, messages=messages, **JSON_MODE_PARAMS)
+        return json.loads(resp.choices[0].message.content)
+    except Exception:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=JSON_MODE_PARAMS["temperature"],
+        )
+        return parse_json_content(resp.choices[0].message.content)
+
+
+def normalize_result(
+    data: Dict[str, Any],
+    cv_source: str,
+    job_text: str,
+    id_source: str = None,
+    cv_hash: str = None,
+) -> Dict[str, Any]:
+    score = safe_int(data.get("overall_score"), 0)
+    reco = (data.get("recommendation") or "Maybe").strip()
+    subs = data.get("subscores") or {}
+    interview = data.get("interview_guide") or {"critical": [], "nice_to_have": []}
+
+    rid = stable_id(job_text[:160], id_source or cv_source, str(score), reco)
+    report_text = json_to_markdown_report(cv_source, data)
+
+    return {
+        "id": rid,
+        "timestamp": now_ts(),
+        "cv_source": cv_source,
+        "overall_score": score,
+        "recommendation": reco,
+        "subscores": {
+            "skills": safe_int(subs.get("skills"), 0),
+            "experience": safe_int(subs.get("experience"), 0),
+            "tools": safe_int(subs.get("tools"), 0),
+            "domain": safe_int(subs.get("domain"), 0),
+        },
+        "summary": data.get("summary", ""),
+        "missing_keywords": data.get("missing_keywords") or [],
+        "strengths": data.get("strengths") or [],
+        "gaps_risks": data.get("gaps_risks") or [],
+        "interview_guide": {
+            "critical": (interview.get("critical") or []),
+            "nice_to_have": (interview.get("nice_to_have") or []),
+        },
+        "cv_improvements": data.get("cv_improvements") or [],
+        "explainable_score": data.get("explainable_score") or {"why_this_score": [], "top_evidence": []},
+        "recruiter_notes": "",
+        "report_text": report_text,
+        "jd_hash": jd_hash(job_text),
+        "cv_hash": cv_hash,
+    }
+
+
+def extraction_error_entry(file_name: str, job_text: str, error: Exception) -> Dict[str, Any]:
+    return {
+        "id": stable_id(job_text[:120], file_name, "extract_error"),
+        "timestamp": now_ts(),
+        "cv_source": file_name,
+        "overall_score": 0,
+        "recommendation": "No",
+        "subscores": {"skills": 0, "experience": 0, "tools": 0, "domain": 0},
+        "summary": "Extraction failed.",
+        "missing_keywords": [],
+        "strengths": [],
+        "gaps_risks": [f"Failed to extract CV text: {error}"],
+        "interview_guide": {"critical": ["Re-upload as DOCX or paste text"], "nice_to_have": []},
+        "cv_improvements": [],
+        "explainable_score": {"why_this_score": ["No text extracted"], "top_evidence": []},
+        "recruiter_notes": "",
+        "report_text": "Extraction failed.",
+        "jd_hash": jd_hash(job_text),
+        "cv_hash": None,
+    }
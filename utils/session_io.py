@@ -0,0 +1,110 @@
+import json
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import msgpack
+import zstandard
+
+
+SESSION_MAGIC = b"TMAS"
+SESSION_VERSION = 1
+SESSION_EXT = "tmas"
+
+# Fields that change without the analysis itself changing; excluded from the content hash.
+VOLATILE_FIELDS = ("id", "timestamp", "recruiter_notes", "content_hash")
+
+
+def content_hash(entry: Dict[str, Any]) -> str:
+    body = {k: v for k, v in entry.items() if k not in VOLATILE_FIELDS}
+    raw = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def ensure_content_hash(entry: Dict[str, Any]) -> str:
+    h = entry.get("content_hash")
+    if not h:
+        h = content_hash(entry)
+        entry["content_hash"] = h
+    return h
+
+
+def dump_session(
+    history: List[Dict[str, Any]],
+    ranking_results: List[Dict[str, Any]],
+    selected_id: str = None,
+    job_text: str = "",
+    shortlist_threshold: int = 75,
+    jd_versions: Dict[str, str] = None,
+    level: int = 6,
+) -> bytes:
+    for h in history:
+        ensure_content_hash(h)
+
+    # Ranking entries are the same dicts as in history, so only their hashes are stored.
+    known = {h["content_hash"] for h in history}
+    extra = [r for r in ranking_results if ensure_content_hash(r) not in known]
+
+    payload = {
+        "version": SESSION_VERSION,
+        "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "history": history + extra,
+        "ranking": [r["content_hash"] for r in ranking_results],
+        "selected_id": selected_id,
+        "job_text": job_text or "",
+        "shortlist_threshold": int(shortlist_threshold),
+        "jd_versions": dict(jd_versions or {}),
+    }
+    packed = msgpack.packb(payload, use_bin_type=True)
+    body = zstandard.ZstdCompressor(level=level).compress(packed)
+    return SESSION_MAGIC + bytes([SESSION_VERSION]) + body
+
+
+def load_session(blob: bytes) -> Dict[str, Any]:
+    if len(blob) < 5 or blob[:4] != SESSION_MAGIC:
+        raise ValueError("Not a Talent Match session file.")
+    version = blob[4]
+    if version > SESSION_VERSION:
+        raise ValueError(f"Session file version {version} is newer than supported ({SESSION_VERSION}).")
+
+    packed = zstandard.ZstdDecompressor().decompress(blob[5:])
+    payload = msgpack.unpackb(packed, raw=False)
+    if not isinstance(payload, dict) or not isinstance(payload.get("history"), list):
+        raise ValueError("Session file is malformed.")
+    return payload
+
+
+def merge_history(
+    history: List[Dict[str, Any]],
+    incoming: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], int, int]:
+    by_hash = {ensure_content_hash(h): h for h in history}
+    used_ids = {h["id"] for h in history}
+    merged = list(history)
+    added = 0
+    updated = 0
+
+    for entry in incoming:
+        h = ensure_content_hash(entry)
+        existing = by_hash.get(h)
+        if existing is not None:
+            notes = (entry.get("recruiter_notes") or "").strip()
+            if notes and not (existing.get("recruiter_notes") or "").strip():
+                existing["recruiter_notes"] = entry["recruiter_notes"]
+                updated += 1
+            continue
+
+        # stable_id() only hashes a prefix of the inputs, so distinct analyses can share an id.
+        if entry.get("id") in used_ids or not entry.get("id"):
+            entry["id"] = h[:12]
+        used_ids.add(entry["id"])
+        by_hash[h] = entry
+        merged.append(entry)
+        added += 1
+
+    return merged, added, updated
+
+
+def resolve_ranking(history: List[Dict[str, Any]], ranking_hashes: List[str]) -> List[Dict[str, Any]]:
+    by_hash = {ensure_content_hash(h): h for h in history}
+    return [by_hash[h] for h in ranking_hashes if h in by_hash]